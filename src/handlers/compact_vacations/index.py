@@ -0,0 +1,89 @@
+from collections import defaultdict
+from datetime import date, datetime
+import os
+
+from aws_lambda_powertools import Logger
+
+from aws.dynamodb import VacationsTable
+from decorators import uncaught_exceptions_handler, warm_up_handler
+from logging_policy import log_invocation
+from holiday_calendars import DEFAULT_HOLIDAYS_COUNTRY
+from working_days import compute_working_days_in_vacation, preload_holidays
+
+
+VACATIONS_DB_TABLE = VacationsTable()
+
+SERVICE_NAME = os.getenv("SERVICE_NAME")
+logger = Logger(service=SERVICE_NAME)
+
+# Time left to process one more scan page, otherwise the run is continued by the next scheduled invocation.
+SCAN_PAGE_TIME_BUDGET_MS = int(os.getenv("SCAN_PAGE_TIME_BUDGET_MS", 60000))
+
+VACATION_DATES_FORMATTING = "%Y-%m-%d"
+
+
+def archive_vacations_page(vacations, holidays_countries):
+    """Fold vacations of one scan page into yearly archives of their users and return count of written archives."""
+    vacations_by_archive = defaultdict(list)
+    for vacation in vacations:
+        workspace_id = vacation["workspace_id"]
+        if workspace_id not in holidays_countries:
+            VACATIONS_DB_TABLE.workspace_id = workspace_id
+            holidays_countries[workspace_id] = VACATIONS_DB_TABLE.get_holidays_country().get(
+                "country_code", DEFAULT_HOLIDAYS_COUNTRY
+            )
+        working_days_by_year = {}
+        compute_working_days_in_vacation(
+            datetime.strptime(vacation["vacation_start_date"], VACATION_DATES_FORMATTING),
+            datetime.strptime(vacation["vacation_end_date"], VACATION_DATES_FORMATTING),
+            working_days_by_year,
+            holidays_countries[workspace_id],
+        )
+        vacation["working_days_by_year"] = working_days_by_year
+        archive_year = int(vacation["vacation_start_date"][:4])
+        vacations_by_archive[(workspace_id, vacation["user_id"], archive_year)].append(vacation)
+
+    # Archives are merged with the already written ones, so vacations of one archive may come in several pages.
+    for (workspace_id, user_id, archive_year), archive_vacations in vacations_by_archive.items():
+        VACATIONS_DB_TABLE.workspace_id = workspace_id
+        VACATIONS_DB_TABLE.archive_vacations(user_id, archive_year, archive_vacations)
+    return len(vacations_by_archive)
+
+
+@logger.inject_lambda_context
+@log_invocation
+@warm_up_handler(preload_holidays)
+@uncaught_exceptions_handler
+def compact_vacations(event, context):
+    """
+    Fold vacations, which ended before the current (or passed in the event) year,
+    into yearly archive items of each user.
+    Pending vacations, which were never decided, are folded too, so past items don't stay in live partitions.
+    Archives are written after each scan page and progress is saved, so a run stopped by the time limit
+    is resumed by the next scheduled invocation.
+    """
+    compaction_year = int(event.get("year") or date.today().year)
+
+    checkpoint = VACATIONS_DB_TABLE.get_vacations_compaction_checkpoint(compaction_year)
+    if checkpoint.get("done"):
+        return
+    last_evaluated_key = checkpoint.get("last_evaluated_key")
+
+    holidays_countries = {}
+    archives_count = 0
+    while context.get_remaining_time_in_millis() > SCAN_PAGE_TIME_BUDGET_MS:
+        vacations, last_evaluated_key = VACATIONS_DB_TABLE.get_vacations_ended_before_page(
+            f"{compaction_year}-01-01", last_evaluated_key
+        )
+        archives_count += archive_vacations_page(vacations, holidays_countries)
+        VACATIONS_DB_TABLE.save_vacations_compaction_checkpoint(
+            compaction_year, last_evaluated_key, done=not last_evaluated_key
+        )
+        if not last_evaluated_key:
+            logger.info(f"Vacations compaction is finished, {archives_count} yearly archives were written by the run.")
+            return
+
+    logger.warning(
+        f"Vacations compaction is not finished in time, {archives_count} yearly archives were written, "
+        f"stopped at {last_evaluated_key}"
+    )
@@ -1,37 +1,51 @@
 import os
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import datetime
 import json
+import logging
 from http import HTTPStatus
 from urllib import parse
 
 from aws_lambda_powertools import Logger
-import holidays
 
-from decorators import uncaught_exceptions_handler
+from decorators import uncaught_exceptions_handler, warm_up_handler
+from logging_policy import log_invocation, allow_fields, prepare_for_logging
+from traffic_capture import capture_traffic
 from exceptions import ValidationError
-from slack.channels import get_channel_members
-from slack.users import get_user, get_bot_user_id
-from slack.messages import send_message
+from slack.channels import is_bot_in_channel, get_channel_members
+from slack.users import get_user
+from slack.messages import (
+    send_message,
+    generate_block_with_text,
+    generate_blocks_with_lines,
+    format_vacation_dates_to_display,
+    MAX_BLOCKS_IN_MESSAGE,
+)
 from slack.views import (
     open_modal_view,
     get_book_vacation_modal_view,
     get_see_user_vacations_modal_view,
+    get_see_team_vacations_modal_view,
     get_configure_workspace_modal_view,
 )
 from aws.dynamodb import VacationsTable
+from holiday_calendars import DEFAULT_HOLIDAYS_COUNTRY
+from working_days import compute_working_days_in_vacation, count_vacations_working_days_by_year, preload_holidays
 
 VACATIONS_DB_TABLE = VacationsTable()
 
 SERVICE_NAME = os.getenv("SERVICE_NAME")
 logger = Logger(service=SERVICE_NAME)
 
-UA_HOLIDAYS = holidays.UA()
 VACATION_DATES_FORMATTING = "%Y-%m-%d"
 VACATION_DATES_FORMATTING_TO_DISPLAY = "%d.%m.%Y"
 
+PAYLOAD_SUMMARY_FIELDS = ("type", "callback_id", "team.id", "user.id", "view.callback_id")
+
 INTERACTIVITY_GET_FUNCTIONS_MAPPING = {
     "book_vacation": get_book_vacation_modal_view,
     "see_user_vacations": get_see_user_vacations_modal_view,
+    "see_team_vacations": get_see_team_vacations_modal_view,
     "configure_workspace": get_configure_workspace_modal_view,
 }
 
@@ -45,12 +59,20 @@ def process_block_actions(payload):
         return
     user_id = block_id_dict["user_id"]
     vacation_id = block_id_dict["vacation_id"]
-    vacation_item = VACATIONS_DB_TABLE.get_vacation(user_id, vacation_id)
+    workspace_id = payload["team"]["id"]
+    if not (vacation_item := VACATIONS_DB_TABLE.get_vacation(user_id, vacation_id)):
+        # Vacations, which ended before the current year, are folded into archives without waiting for a decision.
+        send_message(
+            workspace_id,
+            f"Vacation request of @{get_user(workspace_id, user_id)['name']} is no longer pending "
+            f"and can't be decided :hourglass:",
+            webhook_url=payload["response_url"],
+        )
+        return
     if vacation_item["vacation_status"] != "PENDING":
         return
     new_status = received_action["value"]
     VACATIONS_DB_TABLE.update_vacation_status(user_id, vacation_id, new_status)
-    workspace_id = payload["team"]["id"]
     send_message(
         workspace_id,
         f"Vacation for @{get_user(workspace_id, user_id)['name']} was {new_status.lower()} :ok_hand:",
@@ -88,7 +110,7 @@ def process_configure_workspace_submission(workspace_id, view, user_submitted_id
         "selected_channel"
     ]
     if notifications_channel_id:
-        if get_bot_user_id(workspace_id) not in get_channel_members(workspace_id, notifications_channel_id):
+        if not is_bot_in_channel(workspace_id, notifications_channel_id):
             send_message(
                 workspace_id,
                 (
@@ -100,6 +122,12 @@ def process_configure_workspace_submission(workspace_id, view, user_submitted_id
             )
         else:
             VACATIONS_DB_TABLE.save_notifications_channel(notifications_channel_id)
+    if selected_holidays_country := submission_data[
+        "holidays_country_selector"][
+        "holidays_country_selector"][
+        "selected_option"
+    ]:
+        VACATIONS_DB_TABLE.save_holidays_country(selected_holidays_country["value"])
 
 
 def process_see_user_vacations_submission(workspace_id, view, user_submitted_id):
@@ -108,10 +136,16 @@ def process_see_user_vacations_submission(workspace_id, view, user_submitted_id)
     )
 
 
+def process_see_team_vacations_submission(workspace_id, view, user_submitted_id):
+    channel_id = view["state"]["values"]["channel_selector"]["channel_selector"]["selected_channel"]
+    send_team_vacations(workspace_id, user_submitted_id, channel_id)
+
+
 VIEW_SUBMISSIONS_PROCESSORS_MAPPING = {
     "book_vacation": process_book_vacation_submission,
     "configure_workspace": process_configure_workspace_submission,
-    "see_user_vacations": process_see_user_vacations_submission
+    "see_user_vacations": process_see_user_vacations_submission,
+    "see_team_vacations": process_see_team_vacations_submission,
 }
 
 
@@ -127,26 +161,6 @@ PAYLOAD_PROCESSING_FUNCTIONS_MAPPING = {
 }
 
 
-def compute_working_days_in_vacation(
-        start_date: datetime, end_date: datetime, working_days_by_year_dict
-) -> int:
-    vacation_dates_range = [
-        start_date + timedelta(days=x)
-        for x in range(0, (end_date - start_date + timedelta(days=1)).days)
-    ]
-    working_days_count = 0
-    for date in vacation_dates_range:
-        if not (date.weekday() > 4 or date.strftime(VACATION_DATES_FORMATTING) in UA_HOLIDAYS):
-            working_days_count += 1
-
-            if working_days_by_year_dict.get(date.year):
-                working_days_by_year_dict[date.year] += 1
-            else:
-                working_days_by_year_dict[date.year] = 1
-
-    return working_days_count
-
-
 def send_user_vacations(workspace_id, requester_user_id, interesting_user_id):
     user = get_user(workspace_id, interesting_user_id)
     username = user["name"]
@@ -157,37 +171,107 @@ def send_user_vacations(workspace_id, requester_user_id, interesting_user_id):
         user_vacations.sort(
             key=lambda vacation: datetime.strptime(vacation["vacation_start_date"], VACATION_DATES_FORMATTING)
         )
-        text = f"*@{username}* booked vacations:\n\n"
+        text_parts = [f"*@{username}* booked vacations:\n\n"]
 
         total_working_days = 0
         working_days_by_year_dict = {}
+        holidays_country = VACATIONS_DB_TABLE.get_holidays_country().get("country_code", DEFAULT_HOLIDAYS_COUNTRY)
 
         for index, vacation in enumerate(user_vacations, 1):
             start_date = datetime.strptime(vacation["vacation_start_date"], VACATION_DATES_FORMATTING)
             end_date = datetime.strptime(vacation["vacation_end_date"], VACATION_DATES_FORMATTING)
-            vacation_working_days = compute_working_days_in_vacation(start_date, end_date, working_days_by_year_dict)
+            if archived_working_days_by_year := vacation.get("working_days_by_year"):
+                # Working days of archived vacations are computed once while archiving.
+                vacation_working_days = 0
+                for year, days in archived_working_days_by_year.items():
+                    working_days_by_year_dict[int(year)] = working_days_by_year_dict.get(int(year), 0) + int(days)
+                    vacation_working_days += int(days)
+            else:
+                vacation_working_days = compute_working_days_in_vacation(
+                    start_date, end_date, working_days_by_year_dict, holidays_country
+                )
             total_working_days += vacation_working_days
 
-            text += (
+            text_parts.append(
                 f"*{index}. "
                 f"{start_date.strftime(VACATION_DATES_FORMATTING_TO_DISPLAY)} - "
                 f"{end_date.strftime(VACATION_DATES_FORMATTING_TO_DISPLAY)}*\t\t"
                 f"({vacation_working_days} working days)\n\n"
             )
 
-        text += f"Total working days: *{total_working_days}*\n"
+        text_parts.append(f"Total working days: *{total_working_days}*\n")
         for year, days in working_days_by_year_dict.items():
-            text += f"\t*{days}* days in *{year}* year\n"
+            text_parts.append(f"\t*{days}* days in *{year}* year\n")
+        text = "".join(text_parts)
 
     send_message(workspace_id, text, channel=requester_user_id)
 
 
-@logger.inject_lambda_context(log_event=True)
+def send_team_vacations(workspace_id, requester_user_id, channel_id):
+    """
+    Send current year approved vacations of all channel members.
+    Members vacations are read by BULK_READS_WORKERS concurrent queries (e.g. about 10 sequential rounds
+    of queries for 300 members with 32 workers) and members are mentioned instead of requesting their names.
+    """
+    today = datetime.today()
+    today_string = today.strftime(VACATION_DATES_FORMATTING)
+    current_year = today.year
+    members_vacations = VACATIONS_DB_TABLE.get_users_vacations(
+        get_channel_members(workspace_id, channel_id), include_archive=False
+    )
+    vacations = [
+        vacation
+        for member_vacations in members_vacations.values()
+        for vacation in member_vacations
+        if vacation["vacation_status"] == "APPROVED"
+        and vacation["vacation_start_date"] <= f"{current_year}-12-31"
+        and vacation["vacation_end_date"] >= f"{current_year}-01-01"
+    ]
+    if not vacations:
+        send_message(
+            workspace_id,
+            f"Members of <#{channel_id}> don't have vacations in {current_year} year :thinking_face:",
+            channel=requester_user_id,
+        )
+        return
+
+    holidays_country = VACATIONS_DB_TABLE.get_holidays_country().get("country_code", DEFAULT_HOLIDAYS_COUNTRY)
+    members_working_days = defaultdict(int)
+    members_upcoming_vacations = defaultdict(list)
+    for vacation, working_days_by_year in zip(
+            vacations, count_vacations_working_days_by_year(vacations, holidays_country)
+    ):
+        members_working_days[vacation["user_id"]] += working_days_by_year.get(current_year, 0)
+        if vacation["vacation_end_date"] >= today_string:
+            members_upcoming_vacations[vacation["user_id"]].append(vacation)
+
+    lines = []
+    for user_id, working_days in sorted(members_working_days.items(), key=lambda item: item[1], reverse=True):
+        line = f"<@{user_id}>: *{working_days}* working days"
+        if upcoming_vacations := members_upcoming_vacations[user_id]:
+            upcoming_vacations.sort(key=lambda vacation: vacation["vacation_start_date"])
+            line = f"{line}, upcoming: {', '.join(map(format_vacation_dates_to_display, upcoming_vacations))}"
+        lines.append(line)
+
+    blocks = [generate_block_with_text(f"<#{channel_id}> members vacations in *{current_year}* year:")]
+    blocks.extend(generate_blocks_with_lines(lines))
+    for blocks_start in range(0, len(blocks), MAX_BLOCKS_IN_MESSAGE):
+        send_message(
+            workspace_id, blocks=blocks[blocks_start:blocks_start + MAX_BLOCKS_IN_MESSAGE], channel=requester_user_id
+        )
+
+
+@logger.inject_lambda_context
+@log_invocation
+@warm_up_handler(preload_holidays)
+@capture_traffic("process_interactivity")
 @uncaught_exceptions_handler
 def process_interactivity(event, _):
     request_body_json = parse.parse_qs(event["body"])
     payload = json.loads(request_body_json["payload"][0])
-    logger.info({"payload": payload})
+    logger.info({"payload": allow_fields(payload, PAYLOAD_SUMMARY_FIELDS)})
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug({"payload": prepare_for_logging(payload)})
     workspace_id = payload["team"]["id"]
     VACATIONS_DB_TABLE.workspace_id = workspace_id
 
@@ -4,7 +4,8 @@ from http import HTTPStatus
 from aws_lambda_powertools import Logger
 
 from aws.dynamodb import VacationsTable
-from decorators import uncaught_exceptions_handler
+from decorators import uncaught_exceptions_handler, warm_up_handler
+from logging_policy import log_invocation
 from slack.auth import exchange_oauth_token
 
 
@@ -14,7 +15,9 @@ logger = Logger(service=SERVICE_NAME)
 VACATIONS_DB_TABLE = VacationsTable()
 
 
-@logger.inject_lambda_context(log_event=True)
+@logger.inject_lambda_context
+@log_invocation
+@warm_up_handler()
 @uncaught_exceptions_handler
 def register_new_workspace(event, _):
     # TODO Check if request from Slack
@@ -31,7 +34,9 @@ def register_new_workspace(event, _):
             "body": "<html><body><h1>Sorry, something went wrong. Try again later, please.</h1></body></html>"
         }
 
-    VACATIONS_DB_TABLE.save_workspace(oauth_response["team"]["id"], oauth_response["access_token"])
+    VACATIONS_DB_TABLE.save_workspace(
+        oauth_response["team"]["id"], oauth_response["access_token"], oauth_response.get("bot_user_id")
+    )
 
     return {
         "statusCode": HTTPStatus.CREATED,
@@ -0,0 +1,121 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+import os
+
+from aws_lambda_powertools import Logger
+from slack_sdk import WebClient
+
+from aws.dynamodb import VacationsTable
+from decorators import uncaught_exceptions_handler, warm_up_handler
+from logging_policy import log_invocation
+from slack.messages import MAX_BLOCKS_IN_MESSAGE, generate_blocks_with_lines, format_vacation_dates_to_display
+
+
+VACATIONS_DB_TABLE = VacationsTable()
+
+SERVICE_NAME = os.getenv("SERVICE_NAME")
+logger = Logger(service=SERVICE_NAME)
+
+ABSENCE_DIGESTS_WORKERS = int(os.getenv("ABSENCE_DIGESTS_WORKERS", 32))
+WORKSPACES_PAGE_SIZE = int(os.getenv("WORKSPACES_PAGE_SIZE", 200))
+# Time left to process one more workspaces page, otherwise the run is continued by the next scheduled invocation.
+WORKSPACES_PAGE_TIME_BUDGET_MS = int(os.getenv("WORKSPACES_PAGE_TIME_BUDGET_MS", 120000))
+
+VACATION_DATES_FORMATTING = "%Y-%m-%d"
+
+
+def generate_absence_digest_lines(vacations, usernames, today):
+    today_string = today.strftime(VACATION_DATES_FORMATTING)
+    out_today = []
+    out_this_week = []
+    for vacation in sorted(vacations, key=lambda vacation: vacation["vacation_start_date"]):
+        line = f"@{usernames[vacation['user_id']]}\t\t{format_vacation_dates_to_display(vacation)}"
+        if vacation["vacation_start_date"] <= today_string:
+            out_today.append(line)
+        else:
+            out_this_week.append(line)
+
+    lines = []
+    if out_today:
+        lines.extend(["*Out today:*", *out_today])
+    if out_this_week:
+        if lines:
+            lines.append("")
+        lines.extend(["*Out later this week:*", *out_this_week])
+    return lines
+
+
+def send_workspace_absence_digest(workspace, today, week_end):
+    """
+    Send "who's out" digest to the workspace notifications channel.
+    Uses own table object for the workspace id and own Slack client for the workspace token,
+    so digests of different workspaces can be sent in parallel.
+    """
+    table = VacationsTable()
+    table.workspace_id = workspace["workspace_id"]
+    if not (notifications_channel := table.get_notifications_channel()):
+        return
+
+    week_end_string = week_end.strftime(VACATION_DATES_FORMATTING)
+    vacations = [
+        vacation
+        for vacation in table.get_workspace_vacations_ending_since(today.strftime(VACATION_DATES_FORMATTING))
+        if vacation["vacation_status"] == "APPROVED" and vacation["vacation_start_date"] <= week_end_string
+    ]
+    if not vacations:
+        return
+
+    slack_client = WebClient(token=workspace["access_token"])
+    usernames = {
+        user_id: slack_client.users_info(user=user_id).data["user"]["name"]
+        for user_id in {vacation["user_id"] for vacation in vacations}
+    }
+    # Digests of large workspaces don't fit into one text block or even one message.
+    blocks = generate_blocks_with_lines(generate_absence_digest_lines(vacations, usernames, today))
+    for blocks_start in range(0, len(blocks), MAX_BLOCKS_IN_MESSAGE):
+        slack_client.chat_postMessage(
+            channel=notifications_channel["channel_id"],
+            blocks=blocks[blocks_start:blocks_start + MAX_BLOCKS_IN_MESSAGE],
+        )
+
+
+def send_absence_digest_safely(workspace, today, week_end):
+    try:
+        send_workspace_absence_digest(workspace, today, week_end)
+    except Exception:
+        # One broken workspace (e.g. uninstalled bot) must not stop digests of the others.
+        logger.exception(f"Failed to send absence digest to the workspace {workspace['workspace_id']}")
+
+
+@logger.inject_lambda_context
+@log_invocation
+@warm_up_handler()
+@uncaught_exceptions_handler
+def send_absence_digests(event, context):
+    """
+    Send daily absence digests to all registered workspaces.
+    Progress is saved after each workspaces page, so a run stopped by the time limit
+    is resumed by the next scheduled invocation of the same day.
+    """
+    today = date.today()
+    week_end = today + timedelta(days=6 - today.weekday())
+    digest_date = today.strftime(VACATION_DATES_FORMATTING)
+
+    checkpoint = VACATIONS_DB_TABLE.get_absence_digest_checkpoint(digest_date)
+    if checkpoint.get("done"):
+        return
+    last_evaluated_key = checkpoint.get("last_evaluated_key")
+
+    with ThreadPoolExecutor(max_workers=ABSENCE_DIGESTS_WORKERS) as executor:
+        while context.get_remaining_time_in_millis() > WORKSPACES_PAGE_TIME_BUDGET_MS:
+            workspaces, last_evaluated_key = VACATIONS_DB_TABLE.get_workspaces_page(
+                WORKSPACES_PAGE_SIZE, last_evaluated_key
+            )
+            list(executor.map(lambda workspace: send_absence_digest_safely(workspace, today, week_end), workspaces))
+            VACATIONS_DB_TABLE.save_absence_digest_checkpoint(
+                digest_date, last_evaluated_key, done=not last_evaluated_key
+            )
+            if not last_evaluated_key:
+                return
+
+    logger.warning(f"Absence digests are not sent to all workspaces in time, stopped at {last_evaluated_key}")
@@ -6,8 +6,10 @@ import os
 from aws_lambda_powertools import Logger
 from boto3.dynamodb.types import TypeDeserializer
 
-from decorators import uncaught_exceptions_handler
-from slack.messages import send_message
+from decorators import uncaught_exceptions_handler, warm_up_handler
+from logging_policy import log_invocation
+from traffic_capture import capture_traffic
+from slack.messages import format_vacation_dates_to_display, send_message
 from aws.dynamodb import VacationsTable, EntityType
 from slack.users import get_user
 
@@ -19,7 +21,6 @@ SERVICE_NAME = os.getenv("SERVICE_NAME")
 logger = Logger(service=SERVICE_NAME)
 
 VACATION_DATES_FORMATTING = "%Y-%m-%d"
-VACATION_DATES_FORMATTING_TO_DISPLAY = "%d.%m.%Y"
 
 
 VACATION_STATUSES_RESPONSES_MAPPING = {
@@ -53,30 +54,21 @@ def generate_block_id_for_vacation_decision(user_id, vacation_id):
 
 def notify_team_about_approved_vacation(workspace_id, vacation, notifications_channel_id):
     start_date = datetime.datetime.strptime(vacation["vacation_start_date"], VACATION_DATES_FORMATTING)
-    end_date = datetime.datetime.strptime(vacation["vacation_end_date"], VACATION_DATES_FORMATTING)
     text = f"@{get_user(workspace_id, vacation['user_id'])['name']} booked *vacation* for the following dates:\n\n" \
-           f"*{start_date.strftime(VACATION_DATES_FORMATTING_TO_DISPLAY)} - " \
-           f"{end_date.strftime(VACATION_DATES_FORMATTING_TO_DISPLAY)}*\n\n" \
+           f"*{format_vacation_dates_to_display(vacation)}*\n\n" \
            f"{generate_emoji_set_by_season(start_date)}"
     send_message(workspace_id, text, channel=notifications_channel_id)
 
 
 def notify_requester_about_new_vacation_status(workspace_id, vacation):
-    start_date = datetime.datetime.strptime(vacation["vacation_start_date"], VACATION_DATES_FORMATTING)
-    end_date = datetime.datetime.strptime(vacation["vacation_end_date"], VACATION_DATES_FORMATTING)
     new_vacation_status = vacation["vacation_status"]
     text = f"Your requested *vacation* for the following dates:\n\n" \
-           f"*{start_date.strftime(VACATION_DATES_FORMATTING_TO_DISPLAY)} - " \
-           f"{end_date.strftime(VACATION_DATES_FORMATTING_TO_DISPLAY)}*\n\n" \
-           f"was *{new_vacation_status.lower()}* "
-    text += VACATION_STATUSES_RESPONSES_MAPPING[new_vacation_status]
-
+           f"*{format_vacation_dates_to_display(vacation)}*\n\n" \
+           f"was *{new_vacation_status.lower()}* {VACATION_STATUSES_RESPONSES_MAPPING[new_vacation_status]}"
     send_message(workspace_id, text, channel=vacation["user_id"])
 
 
 def send_vacation_for_approvement(workspace_id, vacation, decision_maker_id):
-    start_date = datetime.datetime.strptime(vacation["vacation_start_date"], VACATION_DATES_FORMATTING)
-    end_date = datetime.datetime.strptime(vacation["vacation_end_date"], VACATION_DATES_FORMATTING)
     blocks = [
         {
             "type": "section",
@@ -91,8 +83,7 @@ def send_vacation_for_approvement(workspace_id, vacation, decision_maker_id):
             "type": "section",
             "text": {
                 "type": "mrkdwn",
-                "text": f"*{start_date.strftime(VACATION_DATES_FORMATTING_TO_DISPLAY)} - "
-                        f"{end_date.strftime(VACATION_DATES_FORMATTING_TO_DISPLAY)}*\n\n"
+                "text": f"*{format_vacation_dates_to_display(vacation)}*\n\n"
             }
         },
         {"type": "divider"},
@@ -126,7 +117,10 @@ def send_vacation_for_approvement(workspace_id, vacation, decision_maker_id):
     send_message(workspace_id, blocks=blocks, channel=decision_maker_id)
 
 
-@logger.inject_lambda_context(log_event=True)
+@logger.inject_lambda_context
+@log_invocation
+@warm_up_handler()
+@capture_traffic("process_vacations")
 @uncaught_exceptions_handler
 def process_vacations(event, _):
     for record in event["Records"]:
@@ -150,7 +144,7 @@ def process_vacations(event, _):
 
             if event_name == "INSERT":
                 user_id = vacation["user_id"]
-                if decision_maker := VACATIONS_DB_TABLE.get_decision_maker():
+                if decision_maker := VACATIONS_DB_TABLE.get_decision_maker(cached=False):
                     send_message(
                         workspace_id,
                         "Vacation has been sent for approval :stuck_out_tongue_winking_eye::+1:",
@@ -162,7 +156,7 @@ def process_vacations(event, _):
             elif event_name == "MODIFY":
                 if (
                     (new_vacation_status := vacation["vacation_status"]) == "APPROVED"
-                    and (notifications_channel := VACATIONS_DB_TABLE.get_notifications_channel())
+                    and (notifications_channel := VACATIONS_DB_TABLE.get_notifications_channel(cached=False))
                 ):
                     notify_team_about_approved_vacation(workspace_id, vacation, notifications_channel["channel_id"])
                 elif new_vacation_status == "DECLINED":
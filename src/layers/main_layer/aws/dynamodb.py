@@ -1,25 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+import logging
 import os
+import time
 from uuid import uuid4
 from datetime import datetime
 
+from aws_lambda_powertools import Logger
 import boto3
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Key, Attr
+from botocore.exceptions import ClientError
 
 from exceptions import ValidationError, NotSpecifiedWorkspaceError
+from logging_policy import prepare_for_logging
 
 
 dynamodb = boto3.resource("dynamodb")
 USER_VACATIONS_TABLE_NAME = os.getenv("USER_VACATIONS_TABLE_NAME")
 
+SERVICE_NAME = os.getenv("SERVICE_NAME")
+logger = Logger(service=SERVICE_NAME)
+ITEMS_CACHE_TTL_SECONDS = int(os.getenv("ITEMS_CACHE_TTL_SECONDS", 360))
+
+# Overloaded index: registered workspaces under "WORKSPACE" partition (sorted by workspace id)
+# and vacations of each workspace under "WORKSPACE#{workspace_id}#VACATION" partition (sorted by end date).
+WORKSPACES_AND_VACATIONS_INDEX_NAME = "gsi2"
+CHECKPOINTS_TTL_SECONDS = 7 * 24 * 60 * 60
+BULK_READS_WORKERS = int(os.getenv("BULK_READS_WORKERS", 32))
+
+# Rarely changed items (workspaces and their settings), shared by all table objects of the container.
+ITEMS_CACHE = {}
+BATCH_GET_ITEMS_LIMIT = 100
+
 
 class EntityType(Enum):
     USER = "USER"
     VACATION = "VACATION"
+    VACATIONS_ARCHIVE = "VACATIONS_ARCHIVE"
     DECISION_MAKER = "DECISION_MAKER"
     CHANNEL = "CHANNEL"
     VACATIONS_NOTIFICATIONS_CHANNEL = "VACATIONS_NOTIFICATIONS_CHANNEL"
+    HOLIDAYS_COUNTRY = "HOLIDAYS_COUNTRY"
     WORKSPACE = "WORKSPACE"
+    ABSENCE_DIGEST_CHECKPOINT = "ABSENCE_DIGEST_CHECKPOINT"
+    VACATIONS_COMPACTION_CHECKPOINT = "VACATIONS_COMPACTION_CHECKPOINT"
+    HEALTH_ALERT = "HEALTH_ALERT"
+
+
+# Workspace settings, which are cached under the same keys as they are stored.
+CACHED_SETTINGS_ENTITY_TYPES = (
+    EntityType.DECISION_MAKER,
+    EntityType.VACATIONS_NOTIFICATIONS_CHANNEL,
+    EntityType.HOLIDAYS_COUNTRY,
+)
 
 
 class VacationsTable:
@@ -55,7 +88,8 @@ class VacationsTable:
                         update_keys_dict[key_name] = f"{self._keys_prefix}#{key_value}"
                     kwargs["Key"] = update_keys_dict
 
-                print(f"I'm invoking method {decorated_method.__name__} with kwargs: {kwargs}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug({"method": decorated_method.__name__, "kwargs": prepare_for_logging(kwargs)})
                 return decorated_method(self, **kwargs)
 
             return wrapper
@@ -79,6 +113,19 @@ class VacationsTable:
     def _keys_prefix(self):
         return self._generate_key(EntityType.WORKSPACE.value, self._workspace_id)
 
+    @staticmethod
+    def _get_cached_item(cache_key, get_item):
+        if (cached := ITEMS_CACHE.get(cache_key)) and cached[0] > time.monotonic():
+            return cached[1]
+        # Missing items aren't cached, they are expected to be saved soon (e.g. settings of a new workspace).
+        if item := get_item():
+            ITEMS_CACHE[cache_key] = (time.monotonic() + ITEMS_CACHE_TTL_SECONDS, item)
+        return item
+
+    @staticmethod
+    def _invalidate_cached_item(cache_key):
+        ITEMS_CACHE.pop(cache_key, None)
+
     @staticmethod
     def format_vacation_string_to_date(string_date):
         return datetime.strptime(string_date, "%Y-%m-%d")
@@ -89,7 +136,6 @@ class VacationsTable:
 
     @_Decorators.crud_workspace_setting
     def _get_item(self, **kwargs):
-        print(kwargs)
         return self._table.get_item(**kwargs)
 
     @_Decorators.crud_workspace_setting
@@ -101,10 +147,13 @@ class VacationsTable:
         return self._table.delete_item(**kwargs)
 
     def save_vacation(self, user_id, vacation_start_date, vacation_end_date, vacation_status="PENDING"):
-        existing_user_vacations = self.get_vacations(user_id)
-
         new_vacation_start_date = self.format_vacation_string_to_date(vacation_start_date)
         new_vacation_end_date = self.format_vacation_string_to_date(vacation_end_date)
+        # Archived vacations ended before the current year, so they can't intersect with newer ones.
+        existing_user_vacations = self.get_vacations(
+            user_id, include_archive=new_vacation_start_date.year < datetime.today().year
+        )
+
         if new_vacation_start_date > new_vacation_end_date:
             raise ValidationError("Start date cannot be later then end date")
 
@@ -126,19 +175,65 @@ class VacationsTable:
                 "vacation_id": vacation_id,
                 "vacation_start_date": vacation_start_date,
                 "vacation_end_date": vacation_end_date,
-                "vacation_status": vacation_status
+                "vacation_status": vacation_status,
+                "gsi2_pk": f"{self._keys_prefix}#{EntityType.VACATION.value}",
+                "gsi2_sk": vacation_end_date,
             }
         )
 
-    def get_vacations(self, user_id):
+    def _query_all_items(self, **kwargs):
+        items = []
+        while True:
+            response = self._table.query(**kwargs)
+            items.extend(response.get("Items", []))
+            if not (last_evaluated_key := response.get("LastEvaluatedKey")):
+                return items
+            kwargs["ExclusiveStartKey"] = last_evaluated_key
+
+    def get_vacations(self, user_id, include_archive=True):
+        """
+        Return user vacations. Vacations from yearly archives are unpacked into
+        the same shape as live vacation items, marked with "archived" flag.
+        """
         if not self.workspace_id:
             raise NotSpecifiedWorkspaceError()
-        return self._table.query(
-            KeyConditionExpression=(
-                Key("pk").eq(f"{self._keys_prefix}#{self._generate_key(EntityType.USER.value, user_id)}")
-                & Key("sk").begins_with(f"{self._keys_prefix}#{EntityType.VACATION.value}")
+        key_condition_expression = Key("pk").eq(
+            f"{self._keys_prefix}#{self._generate_key(EntityType.USER.value, user_id)}"
+        )
+        if not include_archive:
+            key_condition_expression &= Key("sk").begins_with(
+                f"{self._keys_prefix}#{self._generate_key(EntityType.VACATION.value)}"
             )
-        ).get("Items", {})
+
+        vacations = []
+        archive_sk_prefix = f"{self._keys_prefix}#{self._generate_key(EntityType.VACATIONS_ARCHIVE.value)}"
+        for item in self._query_all_items(KeyConditionExpression=key_condition_expression):
+            if item["sk"].startswith(archive_sk_prefix):
+                vacations.extend(
+                    {**archived_vacation, "user_id": user_id, "archived": True}
+                    for archived_vacation in item["vacations"]
+                )
+            else:
+                vacations.append(item)
+        return vacations
+
+    def get_users_vacations(self, user_ids, include_archive=True):
+        """
+        Return vacations of each user as {user_id: vacations}.
+        Vacations are kept in per-user partitions, which can't be batch read, so up to BULK_READS_WORKERS queries
+        run concurrently. The table object is shared by the workers, its queries only build requests
+        for the low-level client of the module DynamoDB resource, which is thread safe.
+        """
+        if not self.workspace_id:
+            raise NotSpecifiedWorkspaceError()
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(BULK_READS_WORKERS, len(user_ids))) as executor:
+            return dict(zip(
+                user_ids, executor.map(lambda user_id: self.get_vacations(user_id, include_archive), user_ids)
+            ))
 
     def get_vacation(self, user_id, vacation_id):
         return self._get_item(
@@ -166,30 +261,264 @@ class VacationsTable:
             }
         )
 
+    def get_workspace_vacations_ending_since(self, date_string):
+        """Return workspace vacations, which end on the date or later, using the workspaces and vacations index."""
+        if not self.workspace_id:
+            raise NotSpecifiedWorkspaceError()
+        return self._query_all_items(
+            IndexName=WORKSPACES_AND_VACATIONS_INDEX_NAME,
+            KeyConditionExpression=(
+                Key("gsi2_pk").eq(f"{self._keys_prefix}#{EntityType.VACATION.value}")
+                & Key("gsi2_sk").gte(date_string)
+            ),
+        )
+
+    def get_vacations_archive(self, user_id, year):
+        return self._get_item(
+            Key={
+                "pk": self._generate_key(EntityType.USER.value, user_id),
+                "sk": self._generate_key(EntityType.VACATIONS_ARCHIVE.value, str(year))
+            }
+        ).get("Item") or {}
+
+    def archive_vacations(self, user_id, year, vacations):
+        """
+        Fold vacation items into the user yearly archive item and delete the original items.
+        Vacations are merged with the already archived ones, so re-running the archiving is safe.
+        Each passed vacation item must contain "working_days_by_year" dict computed by the caller.
+        """
+        archived_vacations = {
+            vacation["vacation_id"]: vacation
+            for vacation in self.get_vacations_archive(user_id, year).get("vacations", [])
+        }
+        for vacation in vacations:
+            archived_vacations[vacation["vacation_id"]] = {
+                "vacation_id": vacation["vacation_id"],
+                "vacation_start_date": vacation["vacation_start_date"],
+                "vacation_end_date": vacation["vacation_end_date"],
+                "vacation_status": vacation["vacation_status"],
+                "working_days_by_year": {
+                    str(vacation_year): days for vacation_year, days in vacation["working_days_by_year"].items()
+                },
+            }
+        archived_vacations = sorted(archived_vacations.values(), key=lambda vacation: vacation["vacation_start_date"])
+
+        self._put_item(
+            Item={
+                "pk": self._generate_key(EntityType.USER.value, user_id),
+                "sk": self._generate_key(EntityType.VACATIONS_ARCHIVE.value, str(year)),
+                "user_id": user_id,
+                "year": year,
+                "vacations": archived_vacations,
+                "total_working_days": sum(
+                    sum(vacation["working_days_by_year"].values()) for vacation in archived_vacations
+                ),
+            }
+        )
+        user_key = f"{self._keys_prefix}#{self._generate_key(EntityType.USER.value, user_id)}"
+        with self._table.batch_writer() as batch:
+            for vacation in vacations:
+                vacation_key = self._generate_key(EntityType.VACATION.value, vacation["vacation_id"])
+                batch.delete_item(Key={"pk": user_key, "sk": f"{self._keys_prefix}#{vacation_key}"})
+
+    def get_vacations_ended_before_page(self, date_string, exclusive_start_key=None):
+        """
+        Scan one page of vacations of all workspaces, which ended before the date.
+        Return the vacations and the key to continue from (None for the last page).
+        """
+        scan_kwargs = {
+            "FilterExpression": (
+                Attr("sk").contains(f"#{self._generate_key(EntityType.VACATION.value)}")
+                & Attr("vacation_end_date").lt(date_string)
+            )
+        }
+        if exclusive_start_key:
+            scan_kwargs["ExclusiveStartKey"] = exclusive_start_key
+        response = self._table.scan(**scan_kwargs)
+        return response.get("Items", []), response.get("LastEvaluatedKey")
+
+    def _get_setting(self, entity_type, cached=True):
+        """
+        Return the workspace setting item, cached by default.
+        Settings are saved by other functions, so readers acting on them (e.g. vacations stream processor)
+        pass cached=False to not act on the replaced setting within the cache TTL.
+        """
+        key = self._generate_key(entity_type.value)
+        if not cached:
+            return self._get_item(Key={"pk": key, "sk": key}).get("Item") or {}
+        return self._get_cached_item(
+            f"{self._keys_prefix}#{key}", lambda: self._get_item(Key={"pk": key, "sk": key}).get("Item") or {}
+        )
+
     def save_decision_maker(self, user_id):
         key = self._generate_key(EntityType.DECISION_MAKER.value)
+        self._invalidate_cached_item(f"{self._keys_prefix}#{key}")
         return self._put_item(Item={"pk": key, "sk": key, "user_id": user_id})
 
-    def get_decision_maker(self):
-        key = self._generate_key(EntityType.DECISION_MAKER.value)
-        return self._get_item(Key={"pk": key, "sk": key}).get("Item") or {}
+    def get_decision_maker(self, cached=True):
+        return self._get_setting(EntityType.DECISION_MAKER, cached)
 
     def save_notifications_channel(self, channel_id):
         if not self.workspace_id:
             raise NotSpecifiedWorkspaceError()
         key = self._generate_key(EntityType.VACATIONS_NOTIFICATIONS_CHANNEL.value)
+        self._invalidate_cached_item(f"{self._keys_prefix}#{key}")
         return self._put_item(Item={"pk": key, "sk": key, "channel_id": channel_id})
 
-    def get_notifications_channel(self):
-        key = self._generate_key(EntityType.VACATIONS_NOTIFICATIONS_CHANNEL.value)
-        return self._get_item(Key={"pk": key, "sk": key}).get("Item") or {}
+    def get_notifications_channel(self, cached=True):
+        return self._get_setting(EntityType.VACATIONS_NOTIFICATIONS_CHANNEL, cached)
+
+    def save_holidays_country(self, country_code):
+        key = self._generate_key(EntityType.HOLIDAYS_COUNTRY.value)
+        self._invalidate_cached_item(f"{self._keys_prefix}#{key}")
+        return self._put_item(Item={"pk": key, "sk": key, "country_code": country_code})
+
+    def get_holidays_country(self, cached=True):
+        return self._get_setting(EntityType.HOLIDAYS_COUNTRY, cached)
 
-    def save_workspace(self, workspace_id, access_token):
+    def save_workspace(self, workspace_id, access_token, bot_user_id=None):
         key = self._generate_key(EntityType.WORKSPACE.value, workspace_id)
-        return self._table.put_item(
-            Item={"pk": key, "sk": key, "workspace_id": workspace_id, "access_token": access_token}
+        item = {
+            "pk": key,
+            "sk": key,
+            "workspace_id": workspace_id,
+            "access_token": access_token,
+            "gsi2_pk": EntityType.WORKSPACE.value,
+            "gsi2_sk": workspace_id,
+        }
+        if bot_user_id:
+            item["bot_user_id"] = bot_user_id
+        self._invalidate_cached_item(key)
+        return self._table.put_item(Item=item)
+
+    def update_workspace_bot_user_id(self, workspace_id, bot_user_id):
+        key = self._generate_key(EntityType.WORKSPACE.value, workspace_id)
+        self._invalidate_cached_item(key)
+        return self._table.update_item(
+            Key={"pk": key, "sk": key},
+            UpdateExpression="SET bot_user_id = :bot_user_id",
+            ExpressionAttributeValues={":bot_user_id": bot_user_id},
         )
 
     def get_workspace(self, workspace_id):
         key = self._generate_key(EntityType.WORKSPACE.value, workspace_id)
+        return self._get_cached_item(key, lambda: self._table.get_item(Key={"pk": key, "sk": key}).get("Item") or {})
+
+    def refresh_cached_workspaces(self, workspace_ids):
+        """
+        Batch read workspaces and their settings into the items cache, replacing already cached ones,
+        so they stay cached for the whole cache TTL. Missing items are dropped from the cache, not cached.
+        """
+        cache_keys = []
+        for workspace_id in workspace_ids:
+            workspace_key = self._generate_key(EntityType.WORKSPACE.value, workspace_id)
+            cache_keys.append(workspace_key)
+            cache_keys.extend(
+                f"{workspace_key}#{self._generate_key(entity_type.value)}"
+                for entity_type in CACHED_SETTINGS_ENTITY_TYPES
+            )
+
+        items = {}
+        for index in range(0, len(cache_keys), BATCH_GET_ITEMS_LIMIT):
+            request_items = {
+                USER_VACATIONS_TABLE_NAME: {
+                    "Keys": [{"pk": key, "sk": key} for key in cache_keys[index:index + BATCH_GET_ITEMS_LIMIT]]
+                }
+            }
+            while request_items:
+                response = dynamodb.batch_get_item(RequestItems=request_items)
+                for item in response.get("Responses", {}).get(USER_VACATIONS_TABLE_NAME, []):
+                    items[item["pk"]] = item
+                request_items = response.get("UnprocessedKeys")
+
+        expires_at = time.monotonic() + ITEMS_CACHE_TTL_SECONDS
+        for cache_key in cache_keys:
+            if item := items.get(cache_key):
+                ITEMS_CACHE[cache_key] = (expires_at, item)
+            else:
+                ITEMS_CACHE.pop(cache_key, None)
+
+    def get_workspaces_page(self, limit, exclusive_start_key=None):
+        """Return registered workspaces page and the key to continue from (None for the last page)."""
+        query_kwargs = {
+            "IndexName": WORKSPACES_AND_VACATIONS_INDEX_NAME,
+            "KeyConditionExpression": Key("gsi2_pk").eq(EntityType.WORKSPACE.value),
+            "Limit": limit,
+        }
+        if exclusive_start_key:
+            query_kwargs["ExclusiveStartKey"] = exclusive_start_key
+        response = self._table.query(**query_kwargs)
+        return response.get("Items", []), response.get("LastEvaluatedKey")
+
+    def _save_checkpoint(self, entity_type, name, last_evaluated_key=None, done=False):
+        key = self._generate_key(entity_type.value, name)
+        item = {"pk": key, "sk": key, "done": done, "expires_at": int(time.time()) + CHECKPOINTS_TTL_SECONDS}
+        if last_evaluated_key:
+            item["last_evaluated_key"] = last_evaluated_key
+        return self._table.put_item(Item=item)
+
+    def _get_checkpoint(self, entity_type, name):
+        key = self._generate_key(entity_type.value, name)
         return self._table.get_item(Key={"pk": key, "sk": key}).get("Item") or {}
+
+    def save_absence_digest_checkpoint(self, digest_date, last_evaluated_key=None, done=False):
+        return self._save_checkpoint(EntityType.ABSENCE_DIGEST_CHECKPOINT, digest_date, last_evaluated_key, done)
+
+    def get_absence_digest_checkpoint(self, digest_date):
+        return self._get_checkpoint(EntityType.ABSENCE_DIGEST_CHECKPOINT, digest_date)
+
+    def save_vacations_compaction_checkpoint(self, year, last_evaluated_key=None, done=False):
+        return self._save_checkpoint(EntityType.VACATIONS_COMPACTION_CHECKPOINT, str(year), last_evaluated_key, done)
+
+    def get_vacations_compaction_checkpoint(self, year):
+        return self._get_checkpoint(EntityType.VACATIONS_COMPACTION_CHECKPOINT, str(year))
+
+    def claim_health_alert_window(self, fingerprint, now, window_seconds, last_error):
+        """
+        Start the alert window of the errors fingerprint, shared by all containers, if there is no active one.
+        Return whether the window is claimed and the previous (claimed) or the active (not claimed) window item.
+        """
+        key = self._generate_key(EntityType.HEALTH_ALERT.value, fingerprint)
+        try:
+            response = self._table.put_item(
+                Item={
+                    "pk": key,
+                    "sk": key,
+                    "window_started_at": now,
+                    "window_ends_at": now + window_seconds,
+                    "occurrences": 0,
+                    "last_error": last_error,
+                    "expires_at": now + 2 * window_seconds,
+                },
+                ConditionExpression=Attr("pk").not_exists() | Attr("window_ends_at").lte(now),
+                ReturnValues="ALL_OLD",
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            return False, self._table.get_item(Key={"pk": key, "sk": key}, ConsistentRead=True).get("Item") or {}
+        return True, response.get("Attributes") or {}
+
+    def add_health_alert_occurrence(self, fingerprint, last_error):
+        key = self._generate_key(EntityType.HEALTH_ALERT.value, fingerprint)
+        return self._table.update_item(
+            Key={"pk": key, "sk": key},
+            UpdateExpression="ADD occurrences :one SET last_error = :last_error",
+            ConditionExpression=Attr("pk").exists(),
+            ExpressionAttributeValues={":one": 1, ":last_error": last_error},
+        )
+
+    def pop_expired_health_alert_window(self, fingerprint, window_ends_at):
+        """Delete the expired window with occurrences and return it, only one of the concurrent callers gets it."""
+        key = self._generate_key(EntityType.HEALTH_ALERT.value, fingerprint)
+        try:
+            response = self._table.delete_item(
+                Key={"pk": key, "sk": key},
+                ConditionExpression=Attr("window_ends_at").eq(window_ends_at) & Attr("occurrences").gt(0),
+                ReturnValues="ALL_OLD",
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            return {}
+        return response.get("Attributes") or {}
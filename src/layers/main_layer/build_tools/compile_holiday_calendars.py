@@ -0,0 +1,64 @@
+"""
+Compile holidays of the countries for the years range into the compact binary file,
+which is loaded at runtime by `holiday_calendars` module instead of computing holidays by `holidays` package.
+
+File layout (little-endian):
+    header: magic b"HCAL", version, first year, last year, countries count (4s H H H H)
+    countries index: country code, data offset in bytes, holidays count (4s I I) per country
+    data: sorted uint32 date ordinals (`date.toordinal()`) of each country holidays
+"""
+import argparse
+from array import array
+from datetime import date
+import struct
+import sys
+
+import holidays
+
+
+MAGIC = b"HCAL"
+VERSION = 1
+HEADER_FORMAT = "<4sHHHH"
+COUNTRY_INDEX_FORMAT = "<4sII"
+
+
+def parse_years_range(years_range):
+    first_year, _, last_year = years_range.partition("-")
+    return int(first_year), int(last_year or first_year)
+
+
+def compile_holiday_calendars(countries, first_year, last_year):
+    years = range(first_year, last_year + 1)
+    countries_ordinals = {}
+    for country in countries:
+        country_holidays = holidays.CountryHoliday(country, years=years)
+        countries_ordinals[country] = array("I", sorted({holiday_date.toordinal() for holiday_date in country_holidays}))
+    if sys.byteorder != "little":
+        for ordinals in countries_ordinals.values():
+            ordinals.byteswap()
+
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, first_year, last_year, len(countries))
+    data_offset = len(header) + struct.calcsize(COUNTRY_INDEX_FORMAT) * len(countries)
+    countries_index = b""
+    for country, ordinals in countries_ordinals.items():
+        countries_index += struct.pack(COUNTRY_INDEX_FORMAT, country.encode("ascii"), data_offset, len(ordinals))
+        data_offset += len(ordinals) * ordinals.itemsize
+
+    return header + countries_index + b"".join(ordinals.tobytes() for ordinals in countries_ordinals.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--countries", nargs="+", required=True, help="ISO country codes, e.g. UA PL")
+    parser.add_argument("--years", required=True, help="Years range, e.g. 2020-2035")
+    parser.add_argument("--output", required=True, help="Path of the compiled file")
+    args = parser.parse_args()
+
+    first_year, last_year = parse_years_range(args.years)
+    countries = [country.upper() for country in args.countries]
+    with open(args.output, "wb") as output_file:
+        output_file.write(compile_holiday_calendars(countries, first_year, last_year))
+
+
+if __name__ == "__main__":
+    main()
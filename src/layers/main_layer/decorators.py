@@ -3,30 +3,40 @@ import os
 
 from aws_lambda_powertools import Logger
 
-from aws.ssm import get_parameter
-from slack.messages import send_message
+from health_alerts import report_error, flush_expired_alerts
+from warm_up import is_warm_up_event, warm_up
 
 
 SERVICE_NAME = os.getenv("SERVICE_NAME")
 logger = Logger(service=SERVICE_NAME)
 
-ROOT_WORKSPACE_ID_SSM_PARAM = os.getenv("ROOT_WORKSPACE_ID_SSM_PARAM")
-ROOT_BOT_HEALTH_CHANNEL_ID_SSM_PARAM = os.getenv("ROOT_BOT_HEALTH_CHANNEL_ID_SSM_PARAM")
-
 
 def uncaught_exceptions_handler(lambda_func):
     def catch_error(*args, **kwargs):
         try:
             lambda_response = lambda_func(*args, **kwargs)
         except Exception as e:
-            send_message(
-                workspace_id=get_parameter(ROOT_WORKSPACE_ID_SSM_PARAM, decrypted=True),
-                text=f"Lambda: {lambda_func.__name__}.\nError: {e}",
-                channel=get_parameter(ROOT_BOT_HEALTH_CHANNEL_ID_SSM_PARAM, decrypted=True),
-            )
             logger.exception("Unexpected error")
+            report_error(lambda_func.__name__, e)
             return {"statusCode": HTTPStatus.OK}
         else:
+            flush_expired_alerts()
             return lambda_response
     return catch_error
 
+
+def warm_up_handler(*preloaders):
+    """
+    Answer scheduled warm up events ({"warm_up": true}) by preloading caches and sending expired health alert
+    summaries instead of invoking the lambda.
+    Preloaders are functions without arguments, preparing handler specific data.
+    """
+    def decorator(lambda_func):
+        def handle_warm_up(event, *args, **kwargs):
+            if is_warm_up_event(event):
+                warm_up(event, preloaders)
+                flush_expired_alerts()
+                return {"statusCode": HTTPStatus.OK}
+            return lambda_func(event, *args, **kwargs)
+        return handle_warm_up
+    return decorator
@@ -0,0 +1,144 @@
+import math
+import os
+import socket
+import time
+from urllib.error import URLError
+
+from aws_lambda_powertools import Logger
+import requests
+from slack_sdk.errors import SlackApiError
+
+from aws.dynamodb import VacationsTable
+from aws.ssm import get_parameter
+from slack.messages import send_message
+
+
+SERVICE_NAME = os.getenv("SERVICE_NAME")
+logger = Logger(service=SERVICE_NAME)
+
+ROOT_WORKSPACE_ID_SSM_PARAM = os.getenv("ROOT_WORKSPACE_ID_SSM_PARAM")
+ROOT_BOT_HEALTH_CHANNEL_ID_SSM_PARAM = os.getenv("ROOT_BOT_HEALTH_CHANNEL_ID_SSM_PARAM")
+
+HEALTH_ALERTS_WINDOW_SECONDS = int(os.getenv("HEALTH_ALERTS_WINDOW_SECONDS", 300))
+
+# Slack API errors returned when Slack itself is overloaded or down, others need an operator action.
+SLACK_UNAVAILABLE_ERRORS = {"ratelimited", "service_unavailable", "fatal_error", "internal_error", "request_timeout"}
+
+VACATIONS_DB_TABLE = VacationsTable()
+
+# Ends of the shared alert windows per errors fingerprint, known by the container.
+ALERTS_WINDOWS = {}
+
+_health_channel = {}
+_slack_unavailable_until = 0
+
+
+def get_health_channel():
+    if not _health_channel:
+        _health_channel.update(
+            workspace_id=get_parameter(ROOT_WORKSPACE_ID_SSM_PARAM, decrypted=True),
+            channel=get_parameter(ROOT_BOT_HEALTH_CHANNEL_ID_SSM_PARAM, decrypted=True),
+        )
+    return _health_channel
+
+
+def is_slack_failure(error):
+    """Check if the error is caused by unavailable Slack (network failures, 5xx or rate limits)."""
+    if isinstance(error, (URLError, socket.timeout, requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, SlackApiError):
+        return error.response.status_code >= 500 or error.response.get("error") in SLACK_UNAVAILABLE_ERRORS
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return False
+
+
+def _send_alert(text):
+    global _slack_unavailable_until
+    if time.monotonic() < _slack_unavailable_until:
+        logger.warning(f"Health alert is not sent, Slack is unavailable: {text}")
+        return
+
+    try:
+        send_message(text=text, **get_health_channel())
+    except Exception:
+        # Don't retry within the window, the same failure is expected for each alert.
+        _slack_unavailable_until = time.monotonic() + HEALTH_ALERTS_WINDOW_SECONDS
+        logger.exception(f"Failed to send health alert: {text}")
+
+
+def _format_occurrences(lambda_name, error_type, window):
+    return (
+        f"Lambda: {lambda_name}.\nError: {error_type}: {window['last_error']}\n"
+        f"*{window['occurrences']}* more occurrences in the last "
+        f"{math.ceil((time.time() - int(window['window_started_at'])) / 60)} minutes."
+    )
+
+
+def _generate_fingerprint(lambda_name, error_type):
+    return f"{lambda_name}#{error_type}"
+
+
+def _add_occurrence(fingerprint, error):
+    try:
+        VACATIONS_DB_TABLE.add_health_alert_occurrence(fingerprint, str(error))
+    except Exception:
+        # Counting repeats is best effort, the error itself is logged by the caller.
+        logger.exception("Failed to count health alert occurrence")
+
+
+def report_error(lambda_name, error):
+    """
+    Send the error to the bot health channel.
+    The same errors (lambda name and exception type) are reported once per window by one of all containers,
+    as the window is claimed in the table. Repeats in any container are counted in the window item
+    and sent as a summary when the window expires.
+    """
+    error_type = type(error).__name__
+    fingerprint = _generate_fingerprint(lambda_name, error_type)
+    now = int(time.time())
+    if (window_ends_at := ALERTS_WINDOWS.get(fingerprint)) and now < window_ends_at:
+        _add_occurrence(fingerprint, error)
+        return
+    try:
+        claimed, window = VACATIONS_DB_TABLE.claim_health_alert_window(
+            fingerprint, now, HEALTH_ALERTS_WINDOW_SECONDS, str(error)
+        )
+    except Exception:
+        # Without the shared window the container deduplicates own errors only.
+        logger.exception("Failed to claim health alert window")
+        claimed, window = True, {}
+    if not claimed:
+        ALERTS_WINDOWS[fingerprint] = int(window.get("window_ends_at", now + HEALTH_ALERTS_WINDOW_SECONDS))
+        _add_occurrence(fingerprint, error)
+        return
+    ALERTS_WINDOWS[fingerprint] = now + HEALTH_ALERTS_WINDOW_SECONDS
+
+    text = f"Lambda: {lambda_name}.\nError: {error_type}: {error}"
+    if window.get("occurrences"):
+        text = f"{_format_occurrences(lambda_name, error_type, window)}\n\n{text}"
+
+    if is_slack_failure(error):
+        # Sending to Slack would most likely fail the same way.
+        logger.warning(f"Health alert is not sent, error is caused by Slack: {text}")
+        return
+    _send_alert(text)
+
+
+def flush_expired_alerts():
+    """
+    Send summaries of the expired windows known by the container, which have suppressed errors.
+    Called after successful and warm up invocations; the window is deleted by the first caller, which sends it.
+    Windows not known by any running container are summarized when the same error claims the next window.
+    """
+    for fingerprint, window_ends_at in list(ALERTS_WINDOWS.items()):
+        if time.time() < window_ends_at:
+            continue
+        del ALERTS_WINDOWS[fingerprint]
+        try:
+            window = VACATIONS_DB_TABLE.pop_expired_health_alert_window(fingerprint, window_ends_at)
+        except Exception:
+            logger.exception("Failed to read expired health alert window")
+            continue
+        if window:
+            _send_alert(_format_occurrences(*fingerprint.split("#", 1), window))
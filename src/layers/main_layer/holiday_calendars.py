@@ -0,0 +1,89 @@
+from array import array
+import datetime
+import mmap
+import os
+import struct
+import sys
+
+from aws_lambda_powertools import Logger
+
+
+SERVICE_NAME = os.getenv("SERVICE_NAME")
+logger = Logger(service=SERVICE_NAME)
+
+# Compiled at the layer build time by build_tools/compile_holiday_calendars.py
+HOLIDAY_CALENDARS_PATH = os.getenv(
+    "HOLIDAY_CALENDARS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "holiday_calendars.bin")
+)
+DEFAULT_HOLIDAYS_COUNTRY = "UA"
+
+MAGIC = b"HCAL"
+HEADER_FORMAT = "<4sHHHH"
+COUNTRY_INDEX_FORMAT = "<4sII"
+
+
+class HolidayCalendars:
+    """
+    Memory mapped holiday calendars. Each country holidays are a sorted array of date ordinals,
+    so checking a date is a binary search without any objects created for the holidays.
+    Dates out of the compiled years range are considered as not holidays.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as calendars_file:
+            self._mmap = mmap.mmap(calendars_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, _, self.first_year, self.last_year, countries_count = struct.unpack_from(HEADER_FORMAT, self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a holiday calendars file.")
+
+        self._countries_ordinals = {}
+        self._working_days_prefix_sums = {}
+        mmap_view = memoryview(self._mmap)
+        index_offset = struct.calcsize(HEADER_FORMAT)
+        for _ in range(countries_count):
+            country, data_offset, holidays_count = struct.unpack_from(COUNTRY_INDEX_FORMAT, self._mmap, index_offset)
+            country_ordinals = mmap_view[data_offset:data_offset + holidays_count * 4].cast("I")
+            if sys.byteorder != "little":
+                country_ordinals = array("I", country_ordinals.tobytes())
+                country_ordinals.byteswap()
+            self._countries_ordinals[country.rstrip(b"\0").decode("ascii")] = country_ordinals
+            index_offset += struct.calcsize(COUNTRY_INDEX_FORMAT)
+
+    @property
+    def countries(self):
+        return list(self._countries_ordinals)
+
+    def get_holidays_ordinals(self, country):
+        if (country_ordinals := self._countries_ordinals.get(country)) is None:
+            logger.warning(f"Holidays of {country} are not compiled, only weekends are considered.")
+            return array("I")
+        return country_ordinals
+
+    def get_working_days_prefix_sums(self, country):
+        """
+        Working days counts from the first compiled day: item i is the count of working days before
+        the i-th day of the compiled range, so any range is counted by one subtraction.
+        """
+        if (prefix_sums := self._working_days_prefix_sums.get(country)) is None:
+            holidays_ordinals = set(self.get_holidays_ordinals(country))
+            first_ordinal = datetime.date(self.first_year, 1, 1).toordinal()
+            last_ordinal = datetime.date(self.last_year, 12, 31).toordinal()
+            prefix_sums = array("I", [0])
+            working_days_count = 0
+            for ordinal in range(first_ordinal, last_ordinal + 1):
+                # Ordinal 1 (01.01.0001) is Monday.
+                if (ordinal - 1) % 7 < 5 and ordinal not in holidays_ordinals:
+                    working_days_count += 1
+                prefix_sums.append(working_days_count)
+            self._working_days_prefix_sums[country] = prefix_sums
+        return prefix_sums
+
+
+_holiday_calendars = None
+
+
+def get_holiday_calendars():
+    global _holiday_calendars
+    if _holiday_calendars is None:
+        _holiday_calendars = HolidayCalendars(HOLIDAY_CALENDARS_PATH)
+    return _holiday_calendars
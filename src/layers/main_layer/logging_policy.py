@@ -0,0 +1,155 @@
+"""
+Logging policy shared by all handlers, keeping CloudWatch log volume low:
+- records of each level are sampled per invocation (LOG_SAMPLING_RATES, e.g. "DEBUG=0.01,INFO=0.1"),
+  levels which are not listed are always logged;
+- events are logged as allow-listed summaries, payloads are truncated and secrets are redacted;
+- full debug logging is enabled for a single invocation by "X-Debug-Log: {DEBUG_LOG_TOKEN}" header
+  (disabled if the token is not configured) or "debug_log": true key of directly invoked event.
+"""
+import hmac
+import logging
+import os
+import random
+import re
+
+from aws_lambda_powertools import Logger
+
+
+SERVICE_NAME = os.getenv("SERVICE_NAME")
+logger = Logger(service=SERVICE_NAME)
+
+LOG_SAMPLING_RATES = {
+    logging.getLevelName(level_name.strip().upper()): float(rate)
+    for level_name, _, rate in (
+        level_rate.partition("=") for level_rate in os.getenv("LOG_SAMPLING_RATES", "").split(",") if level_rate
+    )
+}
+LOG_MAX_STRING_LENGTH = int(os.getenv("LOG_MAX_STRING_LENGTH", 256))
+LOG_MAX_ITEMS = int(os.getenv("LOG_MAX_ITEMS", 20))
+DEBUG_LOG_TOKEN = os.getenv("DEBUG_LOG_TOKEN", "")
+
+SENSITIVE_KEYS_PATTERN = re.compile(r"token|secret|password|authorization|signature|response_url|^code$", re.IGNORECASE)
+REDACTED_VALUE = "***"
+
+# Dotted paths of the events fields, which are safe and useful to log.
+EVENT_SUMMARY_FIELDS = (
+    "path",
+    "httpMethod",
+    "requestContext.requestId",
+    "warm_up",
+)
+
+
+class LogSamplingFilter(logging.Filter):
+    """Decide once per invocation which levels are logged, so the sampled invocations have coherent logs."""
+    def __init__(self, sampling_rates):
+        super().__init__()
+        self.sampling_rates = sampling_rates
+        self.debug_invocation = False
+        self._sampled_levels = {}
+        self.start_invocation()
+
+    def start_invocation(self, debug_invocation=False):
+        self.debug_invocation = debug_invocation
+        self._sampled_levels = {level: random.random() < rate for level, rate in self.sampling_rates.items()}
+
+    def filter(self, record):
+        return self.debug_invocation or self._sampled_levels.get(record.levelno, True)
+
+
+sampling_filter = LogSamplingFilter(LOG_SAMPLING_RATES)
+logging.getLogger(SERVICE_NAME).addFilter(sampling_filter)
+
+
+def redact(value):
+    if isinstance(value, dict):
+        return {
+            key: REDACTED_VALUE if SENSITIVE_KEYS_PATTERN.search(str(key)) else redact(item_value)
+            for key, item_value in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+
+def truncate(value, max_string_length=LOG_MAX_STRING_LENGTH, max_items=LOG_MAX_ITEMS):
+    if isinstance(value, str) and len(value) > max_string_length:
+        return f"{value[:max_string_length]}...({len(value)} chars)"
+    if isinstance(value, dict):
+        truncated = {
+            key: truncate(item_value, max_string_length, max_items)
+            for key, item_value in list(value.items())[:max_items]
+        }
+        if len(value) > max_items:
+            truncated["..."] = f"{len(value)} keys"
+        return truncated
+    if isinstance(value, (list, tuple)):
+        truncated = [truncate(item, max_string_length, max_items) for item in value[:max_items]]
+        if len(value) > max_items:
+            truncated.append(f"...({len(value)} items)")
+        return truncated
+    return value
+
+
+def prepare_for_logging(value):
+    return truncate(redact(value))
+
+
+def allow_fields(value, allowed_fields):
+    """Pick only the dotted paths fields of the dict value."""
+    allowed_value = {}
+    for field_path in allowed_fields:
+        field_value = value
+        for key in field_path.split("."):
+            if not isinstance(field_value, dict) or key not in field_value:
+                break
+            field_value = field_value[key]
+        else:
+            allowed_value[field_path] = field_value
+    return prepare_for_logging(allowed_value)
+
+
+def summarize_event(event):
+    if not isinstance(event, dict):
+        return {"event_type": type(event).__name__}
+    summary = allow_fields(event, EVENT_SUMMARY_FIELDS)
+    if records := event.get("Records"):
+        summary["records_count"] = len(records)
+        summary["events_names"] = sorted({record.get("eventName") for record in records} - {None})
+    if body := event.get("body"):
+        summary["body_length"] = len(body)
+    return summary
+
+
+def is_debug_invocation(event):
+    if not isinstance(event, dict):
+        return False
+    if event.get("debug_log") is True:
+        return True
+    headers = {key.lower(): value for key, value in (event.get("headers") or {}).items()}
+    # Public endpoints are called by anyone, so the header has to carry the secret token.
+    return bool(DEBUG_LOG_TOKEN) and hmac.compare_digest(str(headers.get("x-debug-log", "")), DEBUG_LOG_TOKEN)
+
+
+def log_invocation(lambda_func):
+    """Apply logging policy to the invocation and log its event summary (or the whole event for debug ones)."""
+    def apply_logging_policy(event, *args, **kwargs):
+        std_logger = logging.getLogger(SERVICE_NAME)
+        level = std_logger.level
+        debug_invocation = is_debug_invocation(event)
+        sampling_filter.start_invocation(debug_invocation)
+        if debug_invocation:
+            std_logger.setLevel(logging.DEBUG)
+            event_to_log = prepare_for_logging(event)
+            if isinstance(event, dict) and "body" in event:
+                # Request bodies are logged by handlers after parsing, when secrets in them can be redacted.
+                event_to_log["body"] = summarize_event(event).get("body_length")
+            logger.debug({"event": event_to_log})
+        else:
+            logger.info({"event": summarize_event(event)})
+
+        try:
+            return lambda_func(event, *args, **kwargs)
+        finally:
+            std_logger.setLevel(level)
+    return apply_logging_policy
@@ -1,13 +1,54 @@
+import os
+
+from aws_lambda_powertools import Logger
 from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
 
 from aws.dynamodb import VacationsTable
+from slack.users import get_bot_user_id
 
 
 VACATIONS_DB_TABLE = VacationsTable()
 
+SERVICE_NAME = os.getenv("SERVICE_NAME")
+logger = Logger(service=SERVICE_NAME)
+
 slack_client = WebClient()
 
+CHANNEL_MEMBERS_PAGE_SIZE = 1000
+
+
+def iterate_channel_members_pages(workspace_id, channel_id):
+    """Yield channel members page by page, following the pagination cursor."""
+    slack_client.token = VACATIONS_DB_TABLE.get_workspace(workspace_id)["access_token"]
+    cursor = None
+    while True:
+        response = slack_client.conversations_members(
+            channel=channel_id, limit=CHANNEL_MEMBERS_PAGE_SIZE, cursor=cursor
+        ).data
+        yield response["members"]
+        if not (cursor := response.get("response_metadata", {}).get("next_cursor")):
+            return
+
 
 def get_channel_members(workspace_id, channel_id):
+    return [member for page in iterate_channel_members_pages(workspace_id, channel_id) for member in page]
+
+
+def is_bot_in_channel(workspace_id, channel_id):
+    """
+    Check if HR Bot is a member of the channel.
+    `conversations.info` called with the bot token answers it with a single request,
+    members pages are scanned only if the channel info is not available for the bot.
+    """
     slack_client.token = VACATIONS_DB_TABLE.get_workspace(workspace_id)["access_token"]
-    return slack_client.conversations_members(channel=channel_id).data["members"]
+    try:
+        return slack_client.conversations_info(channel=channel_id).data["channel"].get("is_member", False)
+    except SlackApiError as e:
+        if e.response.get("error") == "channel_not_found":
+            # Private channels are not visible for the bot until it is added there.
+            return False
+        logger.warning(f"Failed to get info of the channel {channel_id}, checking its members list instead.")
+
+    bot_user_id = get_bot_user_id(workspace_id)
+    return any(bot_user_id in members_page for members_page in iterate_channel_members_pages(workspace_id, channel_id))
@@ -1,3 +1,4 @@
+from datetime import datetime
 import os
 from aws_lambda_powertools import Logger
 
@@ -16,11 +17,64 @@ logger = Logger(service=SERVICE_NAME)
 
 slack_client = WebClient()
 
+MAX_BLOCK_TEXT_LENGTH = 3000
+MAX_BLOCKS_IN_MESSAGE = 50
+
+VACATION_DATES_FORMATTING = "%Y-%m-%d"
+VACATION_DATES_FORMATTING_TO_DISPLAY = "%d.%m.%Y"
+
 
 def generate_block_with_text(text):
     return {"type": "section", "text": {"type": "mrkdwn", "text": text}}
 
 
+def format_vacation_dates_to_display(vacation):
+    start_date = datetime.strptime(vacation["vacation_start_date"], VACATION_DATES_FORMATTING)
+    end_date = datetime.strptime(vacation["vacation_end_date"], VACATION_DATES_FORMATTING)
+    return (
+        f"{start_date.strftime(VACATION_DATES_FORMATTING_TO_DISPLAY)} - "
+        f"{end_date.strftime(VACATION_DATES_FORMATTING_TO_DISPLAY)}"
+    )
+
+
+def generate_blocks_with_lines(lines, separator="\n"):
+    """Join lines into as few text blocks as the Slack text length limit allows."""
+    blocks = []
+    block_lines = []
+    block_length = 0
+    for line in lines:
+        if block_lines and block_length + len(separator) + len(line) > MAX_BLOCK_TEXT_LENGTH:
+            blocks.append(generate_block_with_text(separator.join(block_lines)))
+            block_lines = []
+            block_length = 0
+        block_length += len(line) + (len(separator) if block_lines else 0)
+        block_lines.append(line)
+    if block_lines:
+        blocks.append(generate_block_with_text(separator.join(block_lines)))
+    return blocks
+
+
+def render_template(template, patches):
+    """
+    Render a Block Kit template built once per container by setting values at the given key paths.
+    Only containers on the patched paths are copied, the static rest is shared with the template
+    and must be never mutated.
+    """
+    rendered = template.copy()
+    copied_containers = {id(rendered)}
+    for path, value in patches.items():
+        container = rendered
+        for key in path[:-1]:
+            child = container[key]
+            if id(child) not in copied_containers:
+                child = child.copy()
+                container[key] = child
+                copied_containers.add(id(child))
+            container = child
+        container[path[-1]] = value
+    return rendered
+
+
 def send_message(workspace_id, text=None, blocks=None, channel=None, webhook_url=None):
     if not (text or blocks):
         raise ArgumentsError("text or blocks must be passed.")
@@ -10,10 +10,23 @@ VACATIONS_DB_TABLE = VacationsTable()
 
 slack_client = WebClient()
 
+# Bot user id never changes for an installed workspace, so it is safe to keep it for the container lifetime.
+BOT_USER_IDS_CACHE = {}
+
 
 def get_bot_user_id(workspace_id):
-    slack_client.token = VACATIONS_DB_TABLE.get_workspace(workspace_id)["access_token"]
-    return slack_client.auth_test().data["user_id"]
+    if bot_user_id := BOT_USER_IDS_CACHE.get(workspace_id):
+        return bot_user_id
+
+    workspace = VACATIONS_DB_TABLE.get_workspace(workspace_id)
+    if not (bot_user_id := workspace.get("bot_user_id")):
+        # Workspaces installed before the bot user id was stored at install time.
+        slack_client.token = workspace["access_token"]
+        bot_user_id = slack_client.auth_test().data["user_id"]
+        VACATIONS_DB_TABLE.update_workspace_bot_user_id(workspace_id, bot_user_id)
+
+    BOT_USER_IDS_CACHE[workspace_id] = bot_user_id
+    return bot_user_id
 
 
 def get_user(workspace_id, user_id):
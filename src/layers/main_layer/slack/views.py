@@ -7,7 +7,9 @@ from slack_sdk.models.views import View
 from slack_sdk.errors import SlackApiError
 
 from aws.dynamodb import VacationsTable
-from slack.messages import generate_block_with_text
+from holiday_calendars import get_holiday_calendars, DEFAULT_HOLIDAYS_COUNTRY
+from logging_policy import prepare_for_logging
+from slack.messages import generate_block_with_text, render_template
 
 
 VACATIONS_DB_TABLE = VacationsTable()
@@ -27,100 +29,163 @@ def open_modal_view(workspace_id, trigger_id, modal_view_body):
         logger.exception("Failed to open view.")
         raise
     else:
-        logger.info(response.data)
+        logger.debug(prepare_for_logging(response.data))
+
+
+BOOK_VACATION_MODAL_VIEW_TEMPLATE = View(
+    type="modal",
+    callback_id="book_vacation",
+    title={"type": "plain_text", "text": "Book a vacation", "emoji": True},
+    submit={"type": "plain_text", "text": "Submit", "emoji": True},
+    close={"type": "plain_text", "text": "Cancel", "emoji": True},
+    blocks=[
+        generate_block_with_text("*Please select the vacation start date:*"),
+        {
+            "type": "actions",
+            "block_id": "vacation_dates",
+            "elements": [
+                {"type": "datepicker", "action_id": "vacation_start_date"},
+                {"type": "datepicker", "action_id": "vacation_end_date"},
+            ],
+        }
+    ]
+).to_dict()
+
+SEE_USER_VACATIONS_MODAL_VIEW = View(
+    type="modal",
+    callback_id="see_user_vacations",
+    title={"type": "plain_text", "text": "See vacations", "emoji": True},
+    submit={"type": "plain_text", "text": "Submit", "emoji": True},
+    close={"type": "plain_text", "text": "Cancel", "emoji": True},
+    blocks=[
+        {
+            "type": "section",
+            "block_id": "user_selector",
+            "text": {"type": "mrkdwn", "text": "Pick a user to see his (her) vacations:"},
+            "accessory": {
+                "type": "users_select",
+                "action_id": "user_selector",
+                "placeholder": {"type": "plain_text", "text": "Select a user"},
+            },
+        }
+    ]
+).to_dict()
+
+SEE_TEAM_VACATIONS_MODAL_VIEW = View(
+    type="modal",
+    callback_id="see_team_vacations",
+    title={"type": "plain_text", "text": "See team vacations", "emoji": True},
+    submit={"type": "plain_text", "text": "Submit", "emoji": True},
+    close={"type": "plain_text", "text": "Cancel", "emoji": True},
+    blocks=[
+        {
+            "type": "section",
+            "block_id": "channel_selector",
+            "text": {"type": "mrkdwn", "text": "Pick a channel to see vacations of its members:"},
+            "accessory": {
+                "type": "channels_select",
+                "action_id": "channel_selector",
+                "placeholder": {"type": "plain_text", "text": "Select a channel"},
+            },
+        }
+    ]
+).to_dict()
+
+# Holidays country options are known only after the holiday calendars are loaded, so the template is built lazily.
+CONFIGURE_WORKSPACE_MODAL_VIEW_TEMPLATE_CACHE = {}
+
+
+def _get_configure_workspace_modal_view_template():
+    if "template" not in CONFIGURE_WORKSPACE_MODAL_VIEW_TEMPLATE_CACHE:
+        CONFIGURE_WORKSPACE_MODAL_VIEW_TEMPLATE_CACHE["template"] = View(
+            type="modal",
+            callback_id="configure_workspace",
+            title={"type": "plain_text", "text": "Configure workspace", "emoji": True},
+            submit={"type": "plain_text", "text": "Submit", "emoji": True},
+            close={"type": "plain_text", "text": "Cancel", "emoji": True},
+            blocks=[
+                {
+                    "type": "section",
+                    "block_id": "vacations_decision_maker_selector",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": "Pick a user which will make decisions for vacations:"
+                    },
+                    "accessory": {
+                        "action_id": "vacations_decision_maker_selector",
+                        "type": "users_select",
+                        "placeholder": {
+                            "type": "plain_text",
+                            "text": "Select a user"
+                        }
+                    }
+                },
+                {
+                    "type": "section",
+                    "block_id": "approved_vacations_notifications_selector",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": "Pick a channel for notifications about approved vacations:"
+                    },
+                    "accessory": {
+                        "action_id": "approved_vacations_notifications_selector",
+                        "type": "channels_select",
+                        "placeholder": {
+                            "type": "plain_text",
+                            "text": "Select a channel"
+                        }
+                    }
+                },
+                {
+                    "type": "section",
+                    "block_id": "holidays_country_selector",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": "Pick a country, which holidays are not counted as vacation working days:"
+                    },
+                    "accessory": {
+                        "action_id": "holidays_country_selector",
+                        "type": "static_select",
+                        "placeholder": {
+                            "type": "plain_text",
+                            "text": "Select a country"
+                        },
+                        "options": [
+                            {"text": {"type": "plain_text", "text": country}, "value": country}
+                            for country in get_holiday_calendars().countries
+                        ],
+                    }
+                },
+            ]
+        ).to_dict()
+    return CONFIGURE_WORKSPACE_MODAL_VIEW_TEMPLATE_CACHE["template"]
 
 
 def get_book_vacation_modal_view(*args, **kwargs):
     today_string = str(datetime.date.today())
-    return View(
-        type="modal",
-        callback_id="book_vacation",
-        title={"type": "plain_text", "text": "Book a vacation", "emoji": True},
-        submit={"type": "plain_text", "text": "Submit", "emoji": True},
-        close={"type": "plain_text", "text": "Cancel", "emoji": True},
-        blocks=[
-            generate_block_with_text("*Please select the vacation start date:*"),
-            {
-                "type": "actions",
-                "block_id": "vacation_dates",
-                "elements": [
-                    {"type": "datepicker", "initial_date": today_string, "action_id": "vacation_start_date"},
-                    {"type": "datepicker", "initial_date": today_string, "action_id": "vacation_end_date"},
-                ],
-            }
-        ]
-    )
+    return render_template(BOOK_VACATION_MODAL_VIEW_TEMPLATE, {
+        ("blocks", 1, "elements", 0, "initial_date"): today_string,
+        ("blocks", 1, "elements", 1, "initial_date"): today_string,
+    })
 
 
 def get_see_user_vacations_modal_view(*args, **kwargs):
-    return View(
-        type="modal",
-        callback_id="see_user_vacations",
-        title={"type": "plain_text", "text": "See vacations", "emoji": True},
-        submit={"type": "plain_text", "text": "Submit", "emoji": True},
-        close={"type": "plain_text", "text": "Cancel", "emoji": True},
-        blocks=[
-            {
-                "type": "section",
-                "block_id": "user_selector",
-                "text": {"type": "mrkdwn", "text": "Pick a user to see his (her) vacations:"},
-                "accessory": {
-                    "type": "users_select",
-                    "action_id": "user_selector",
-                    "placeholder": {"type": "plain_text", "text": "Select a user"},
-                },
-            }
-        ]
-    )
+    return SEE_USER_VACATIONS_MODAL_VIEW
+
+
+def get_see_team_vacations_modal_view(*args, **kwargs):
+    return SEE_TEAM_VACATIONS_MODAL_VIEW
 
 
 def get_configure_workspace_modal_view(table_object: VacationsTable):
-    decision_maker_selector_block = {
-        "type": "section",
-        "block_id": "vacations_decision_maker_selector",
-        "text": {
-            "type": "mrkdwn",
-            "text": "Pick a user which will make decisions for vacations:"
-        },
-        "accessory": {
-            "action_id": "vacations_decision_maker_selector",
-            "type": "users_select",
-            "placeholder": {
-                "type": "plain_text",
-                "text": "Select a user"
-            }
-        }
-    }
+    template = _get_configure_workspace_modal_view_template()
+    patches = {}
     if decision_maker := table_object.get_decision_maker():
-        decision_maker_selector_block["accessory"]["initial_user"] = decision_maker["user_id"]
-
-    notifications_channel_selector_block = {
-        "type": "section",
-        "block_id": "approved_vacations_notifications_selector",
-        "text": {
-            "type": "mrkdwn",
-            "text": "Pick a channel for notifications about approved vacations:"
-        },
-        "accessory": {
-            "action_id": "approved_vacations_notifications_selector",
-            "type": "channels_select",
-            "placeholder": {
-                "type": "plain_text",
-                "text": "Select a channel"
-            }
-        }
-    }
+        patches[("blocks", 0, "accessory", "initial_user")] = decision_maker["user_id"]
     if notifications_channel := table_object.get_notifications_channel():
-        notifications_channel_selector_block["accessory"]["initial_channel"] = notifications_channel["channel_id"]
-
-    return View(
-        type="modal",
-        callback_id="configure_workspace",
-        title={"type": "plain_text", "text": "Configure workspace", "emoji": True},
-        submit={"type": "plain_text", "text": "Submit", "emoji": True},
-        close={"type": "plain_text", "text": "Cancel", "emoji": True},
-        blocks=[
-            decision_maker_selector_block,
-            notifications_channel_selector_block
-        ]
-    )
+        patches[("blocks", 1, "accessory", "initial_channel")] = notifications_channel["channel_id"]
+    holidays_country = table_object.get_holidays_country().get("country_code", DEFAULT_HOLIDAYS_COUNTRY)
+    for option in template["blocks"][2]["accessory"]["options"]:
+        if option["value"] == holidays_country:
+            patches[("blocks", 2, "accessory", "initial_option")] = option
+    return render_template(template, patches)
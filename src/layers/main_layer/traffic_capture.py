@@ -0,0 +1,148 @@
+"""
+Opt-in capture of sampled handler events for performance regression testing with tools/replay_traffic.py.
+Events are anonymized before leaving the lambda: Slack user and team ids are remapped to stable pseudonyms,
+names are replaced by pseudonyms derived from the remapped ids, posted messages content, secrets and headers
+are dropped. Each captured event is stored as gzipped JSON line in TRAFFIC_CAPTURE_BUCKET_NAME.
+"""
+from datetime import datetime
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import time
+from urllib import parse
+
+from aws_lambda_powertools import Logger
+import boto3
+
+from logging_policy import SENSITIVE_KEYS_PATTERN
+
+
+SERVICE_NAME = os.getenv("SERVICE_NAME")
+logger = Logger(service=SERVICE_NAME)
+
+TRAFFIC_CAPTURE_SAMPLING_RATE = float(os.getenv("TRAFFIC_CAPTURE_SAMPLING_RATE", 0))
+TRAFFIC_CAPTURE_BUCKET_NAME = os.getenv("TRAFFIC_CAPTURE_BUCKET_NAME")
+TRAFFIC_CAPTURE_SALT = os.getenv("TRAFFIC_CAPTURE_SALT", "").encode()
+
+# User (U, W) and team (T) ids, e.g. U01ABCD2EFG. Words like "WORKSPACE" are not matched as they have no digits.
+SLACK_IDS_PATTERN = re.compile(r"\b[UWT](?=[A-Z0-9]*[0-9])[A-Z0-9]{8,}\b")
+DROPPED_KEYS = {"headers", "multiValueHeaders"}
+RESPONSE_URL_PLACEHOLDER = "https://hooks.slack.invalid/anonymized"
+ANONYMIZED_VALUE = "ANONYMIZED"
+# Names of users, teams and channels, replaced by pseudonyms derived from the id of the same object.
+NAME_KEYS = {"username", "name", "real_name", "display_name", "domain", "user_name", "team_domain", "channel_name"}
+# Posted message content, which mentions users by their names.
+MESSAGE_CONTENT_KEYS = {"text", "blocks", "attachments"}
+
+_s3_client = None
+
+
+def remap_slack_id(slack_id):
+    digest = hmac.new(TRAFFIC_CAPTURE_SALT, slack_id.encode(), hashlib.sha256).hexdigest()
+    return f"{slack_id[0]}0{digest[:9].upper()}"
+
+
+def _generate_name_pseudonym(name_key, object_id):
+    if not isinstance(object_id, str):
+        return ANONYMIZED_VALUE
+    return f"{name_key}-{anonymize(object_id).lower()}"
+
+
+def anonymize(value):
+    if isinstance(value, dict):
+        anonymized = {}
+        object_id = value.get("id")
+        for key, item_value in value.items():
+            if key in DROPPED_KEYS:
+                continue
+            if key == "response_url":
+                anonymized[key] = RESPONSE_URL_PLACEHOLDER
+            elif SENSITIVE_KEYS_PATTERN.search(str(key)):
+                anonymized[key] = ANONYMIZED_VALUE
+            elif key in NAME_KEYS:
+                anonymized[key] = _generate_name_pseudonym(key, object_id)
+            elif key == "message" and isinstance(item_value, dict):
+                anonymized[key] = anonymize({
+                    message_key: message_value
+                    for message_key, message_value in item_value.items() if message_key not in MESSAGE_CONTENT_KEYS
+                })
+            else:
+                anonymized[key] = anonymize(item_value)
+        return anonymized
+    if isinstance(value, list):
+        return [anonymize(item) for item in value]
+    if isinstance(value, str):
+        return SLACK_IDS_PATTERN.sub(lambda match: remap_slack_id(match.group()), value)
+    return value
+
+
+def transform_interactivity_body(body, transform):
+    """Apply the transform to Slack interactivity payload, which is sent as JSON in the form encoded body."""
+    body_params = parse.parse_qs(body)
+    if "payload" not in body_params:
+        return transform(body)
+    body_params["payload"] = [json.dumps(transform(json.loads(payload))) for payload in body_params["payload"]]
+    return parse.urlencode(body_params, doseq=True)
+
+
+def _anonymize_body(body):
+    if isinstance(body, str):
+        # Form encoded body without payload, e.g. slash command with user_name and team_domain params.
+        return parse.urlencode(anonymize(parse.parse_qs(body)), doseq=True)
+    return anonymize(body)
+
+
+def anonymize_event(event):
+    anonymized_event = anonymize(event)
+    if isinstance(anonymized_event.get("body"), str):
+        anonymized_event["body"] = transform_interactivity_body(event["body"], _anonymize_body)
+    return anonymized_event
+
+
+def _get_s3_client():
+    global _s3_client
+    if _s3_client is None:
+        _s3_client = boto3.client("s3")
+    return _s3_client
+
+
+def save_captured_event(handler_name, event, request_id):
+    captured_event = {"handler": handler_name, "captured_at": time.time(), "event": anonymize_event(event)}
+    _get_s3_client().put_object(
+        Bucket=TRAFFIC_CAPTURE_BUCKET_NAME,
+        Key=f"captures/{handler_name}/{datetime.utcnow():%Y/%m/%d}/{request_id}.jsonl.gz",
+        Body=gzip.compress(json.dumps(captured_event, default=str).encode() + b"\n"),
+        ContentEncoding="gzip",
+    )
+
+
+def _capture_sampled_event(handler_name, event, request_id):
+    if not TRAFFIC_CAPTURE_SALT:
+        logger.warning("Event is not captured, TRAFFIC_CAPTURE_SALT is not set")
+        return
+    try:
+        save_captured_event(handler_name, event, request_id)
+    except Exception:
+        logger.exception("Failed to capture the event")
+
+
+def capture_traffic(handler_name):
+    """
+    Capture sampled events of the handler (TRAFFIC_CAPTURE_SAMPLING_RATE) after the handler is invoked.
+    Events aren't captured without TRAFFIC_CAPTURE_SALT, as unsalted pseudonyms of Slack ids can be reversed.
+    The S3 upload of a sampled event runs synchronously before the response is returned, so it adds latency,
+    e.g. within the 3 seconds Slack waits for process_interactivity acknowledgement.
+    """
+    def decorator(lambda_func):
+        def capture_event(event, context, *args, **kwargs):
+            try:
+                return lambda_func(event, context, *args, **kwargs)
+            finally:
+                if TRAFFIC_CAPTURE_BUCKET_NAME and random.random() < TRAFFIC_CAPTURE_SAMPLING_RATE:
+                    _capture_sampled_event(handler_name, event, context.aws_request_id)
+        return capture_event
+    return decorator
@@ -0,0 +1,50 @@
+import os
+
+from aws_lambda_powertools import Logger
+
+from aws.dynamodb import VacationsTable
+from health_alerts import get_health_channel
+
+
+SERVICE_NAME = os.getenv("SERVICE_NAME")
+logger = Logger(service=SERVICE_NAME)
+
+VACATIONS_DB_TABLE = VacationsTable()
+
+# Registered workspaces are read in the workspace id order, so warm ups cover an arbitrary subset of them
+# (not the most active ones) if there are more workspaces than the limit.
+WARM_UP_WORKSPACES_LIMIT = int(os.getenv("WARM_UP_WORKSPACES_LIMIT", 200))
+
+
+def is_warm_up_event(event):
+    return isinstance(event, dict) and bool(event.get("warm_up"))
+
+
+def get_warm_up_workspace_ids():
+    """Return the root workspace and the first registered workspaces by id, up to the limit."""
+    workspace_ids = {get_health_channel()["workspace_id"]}
+    last_evaluated_key = None
+    while len(workspace_ids) < WARM_UP_WORKSPACES_LIMIT:
+        workspaces, last_evaluated_key = VACATIONS_DB_TABLE.get_workspaces_page(
+            WARM_UP_WORKSPACES_LIMIT - len(workspace_ids), last_evaluated_key
+        )
+        workspace_ids.update(workspace["workspace_id"] for workspace in workspaces)
+        if not last_evaluated_key:
+            break
+    return workspace_ids
+
+
+def warm_up(event, preloaders=()):
+    """
+    Fill container caches and open DynamoDB and SSM connections without any business logic.
+    Cached workspaces and their settings are refreshed, so with cache TTL longer than the warm up period
+    they don't expire in warmed containers.
+    """
+    try:
+        VACATIONS_DB_TABLE.refresh_cached_workspaces(get_warm_up_workspace_ids())
+
+        for preload in preloaders:
+            preload()
+    except Exception:
+        # Warm up is best effort, the real request will do the same and report errors if any.
+        logger.exception("Failed to warm up")
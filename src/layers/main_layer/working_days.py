@@ -0,0 +1,60 @@
+from datetime import date, datetime
+
+from holiday_calendars import get_holiday_calendars, DEFAULT_HOLIDAYS_COUNTRY
+
+
+VACATION_DATES_FORMATTING = "%Y-%m-%d"
+
+
+def count_working_days_by_year(start_date, end_date, country=DEFAULT_HOLIDAYS_COUNTRY):
+    """
+    Count working days of the dates range per year by the working days prefix sums,
+    so the cost doesn't depend on the range length. Years with no working days are omitted.
+    """
+    holiday_calendars = get_holiday_calendars()
+    prefix_sums = holiday_calendars.get_working_days_prefix_sums(country)
+    first_compiled_ordinal = date(holiday_calendars.first_year, 1, 1).toordinal()
+
+    working_days_by_year = {}
+    for year in range(start_date.year, end_date.year + 1):
+        first_ordinal = max(start_date.toordinal(), date(year, 1, 1).toordinal())
+        last_ordinal = min(end_date.toordinal(), date(year, 12, 31).toordinal())
+        if holiday_calendars.first_year <= year <= holiday_calendars.last_year:
+            first_index = first_ordinal - first_compiled_ordinal
+            last_index = last_ordinal - first_compiled_ordinal
+            working_days_count = prefix_sums[last_index + 1] - prefix_sums[first_index]
+        else:
+            # Holidays are not compiled for the year, only weekends are skipped. Ordinal 1 is Monday.
+            working_days_count = sum(1 for ordinal in range(first_ordinal, last_ordinal + 1) if (ordinal - 1) % 7 < 5)
+        if working_days_count:
+            working_days_by_year[year] = working_days_count
+    return working_days_by_year
+
+
+def count_vacations_working_days_by_year(vacations, country=DEFAULT_HOLIDAYS_COUNTRY):
+    """Count working days by year for each of the vacations with the same prefix sums in one pass."""
+    return [
+        count_working_days_by_year(
+            datetime.strptime(vacation["vacation_start_date"], VACATION_DATES_FORMATTING),
+            datetime.strptime(vacation["vacation_end_date"], VACATION_DATES_FORMATTING),
+            country,
+        )
+        for vacation in vacations
+    ]
+
+
+def compute_working_days_in_vacation(
+        start_date: datetime, end_date: datetime, working_days_by_year_dict, country=DEFAULT_HOLIDAYS_COUNTRY
+) -> int:
+    working_days_count = 0
+    for year, days in count_working_days_by_year(start_date, end_date, country).items():
+        working_days_count += days
+        working_days_by_year_dict[year] = working_days_by_year_dict.get(year, 0) + days
+    return working_days_count
+
+
+def preload_holidays():
+    """Map the compiled holiday calendars and count working days prefix sums of all countries in advance."""
+    holiday_calendars = get_holiday_calendars()
+    for country in holiday_calendars.countries:
+        holiday_calendars.get_working_days_prefix_sums(country)
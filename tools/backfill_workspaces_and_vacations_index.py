@@ -0,0 +1,100 @@
+"""
+Add gsi2 attributes (workspaces and vacations index) to workspace and vacation items written before the index existed,
+so the absence digests and warm ups see the workspaces registered earlier and their vacations.
+
+The table is scanned page by page for items without gsi2_pk, each item is updated in place only if it still exists.
+The backfill is idempotent, a stopped run is resumed from the printed key by --exclusive-start-key or simply re-run.
+
+Example:
+    python tools/backfill_workspaces_and_vacations_index.py --table-name <UserVacationsTable name> --dry-run
+"""
+import argparse
+import json
+import os
+import sys
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAYER_DIR = os.path.join(REPO_ROOT, "src", "layers", "main_layer")
+
+
+def generate_index_attributes(item):
+    """Return gsi2 attributes of the workspace or vacation item, or None for items of other types."""
+    from aws.dynamodb import EntityType
+
+    pk_parts = item["pk"].split("#")
+    sk_parts = item["sk"].split("#")
+    if pk_parts[0] != EntityType.WORKSPACE.value:
+        return None
+    workspace_id = pk_parts[1]
+    if item["pk"] == item["sk"] and len(pk_parts) == 2:
+        return {"gsi2_pk": EntityType.WORKSPACE.value, "gsi2_sk": workspace_id}
+    if len(sk_parts) == 4 and sk_parts[2] == EntityType.VACATION.value and "vacation_end_date" in item:
+        return {
+            "gsi2_pk": f"{EntityType.WORKSPACE.value}#{workspace_id}#{EntityType.VACATION.value}",
+            "gsi2_sk": item["vacation_end_date"],
+        }
+    return None
+
+
+def backfill_item(table, item, index_attributes):
+    try:
+        table.update_item(
+            Key={"pk": item["pk"], "sk": item["sk"]},
+            UpdateExpression="SET gsi2_pk = :gsi2_pk, gsi2_sk = :gsi2_sk",
+            ConditionExpression=Attr("pk").exists(),
+            ExpressionAttributeValues={
+                ":gsi2_pk": index_attributes["gsi2_pk"], ":gsi2_sk": index_attributes["gsi2_sk"]
+            },
+        )
+    except ClientError as e:
+        # The item is deleted (e.g. declined or archived vacation) since it was scanned.
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--table-name", required=True, help="Name of the user vacations table")
+    parser.add_argument("--endpoint-url", help="DynamoDB endpoint, e.g. http://localhost:8000 for local tables")
+    parser.add_argument("--exclusive-start-key", type=json.loads, help="Key to resume the scan from, as printed")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the items to backfill")
+    args = parser.parse_args()
+
+    os.environ.setdefault("USER_VACATIONS_TABLE_NAME", args.table_name)
+    sys.path.insert(0, LAYER_DIR)
+
+    table = boto3.resource("dynamodb", endpoint_url=args.endpoint_url).Table(args.table_name)
+    scan_kwargs = {
+        "FilterExpression": Attr("gsi2_pk").not_exists(),
+        "ProjectionExpression": "pk, sk, vacation_end_date",
+    }
+    if args.exclusive_start_key:
+        scan_kwargs["ExclusiveStartKey"] = args.exclusive_start_key
+
+    counts = {"workspaces": 0, "vacations": 0, "deleted": 0}
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get("Items", []):
+            if not (index_attributes := generate_index_attributes(item)):
+                continue
+            if args.dry_run or backfill_item(table, item, index_attributes):
+                counts["vacations" if "#" in index_attributes["gsi2_pk"] else "workspaces"] += 1
+            else:
+                counts["deleted"] += 1
+        if not (last_evaluated_key := response.get("LastEvaluatedKey")):
+            break
+        scan_kwargs["ExclusiveStartKey"] = last_evaluated_key
+        print(f"Scanned up to {json.dumps(last_evaluated_key)}: {counts}", flush=True)
+
+    print(f"{'Would backfill' if args.dry_run else 'Backfilled'}: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Benchmark rendering of Block Kit modals from the templates built once per container (slack/views.py
+of the main layer) against building and validating slack_sdk View objects on every call, as they were built
+before the templates. Each case is rendered and JSON encoded, as slack_sdk does before sending.
+
+Holiday calendars have to be compiled locally (build_tools/compile_holiday_calendars.py of the main layer)
+and passed by HOLIDAY_CALENDARS_PATH environment variable.
+
+Example:
+    HOLIDAY_CALENDARS_PATH=holiday_calendars.bin python tools/benchmark_block_templates.py --number 20000
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import timeit
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAYER_DIR = os.path.join(REPO_ROOT, "src", "layers", "main_layer")
+
+
+class FakeSettingsTable:
+    """Returns workspace settings from memory, so only rendering is measured."""
+    def get_decision_maker(self):
+        return {"user_id": "U0BENCHBOSS"}
+
+    def get_notifications_channel(self):
+        return {"channel_id": "C0BENCHNEWS"}
+
+    def get_holidays_country(self):
+        return {"country_code": "UA"}
+
+
+def build_configure_workspace_modal_view_from_scratch(table_object):
+    from slack_sdk.models.views import View
+    from holiday_calendars import get_holiday_calendars
+
+    decision_maker_selector_block = {
+        "type": "section",
+        "block_id": "vacations_decision_maker_selector",
+        "text": {"type": "mrkdwn", "text": "Pick a user which will make decisions for vacations:"},
+        "accessory": {
+            "action_id": "vacations_decision_maker_selector",
+            "type": "users_select",
+            "placeholder": {"type": "plain_text", "text": "Select a user"},
+            "initial_user": table_object.get_decision_maker()["user_id"],
+        }
+    }
+    notifications_channel_selector_block = {
+        "type": "section",
+        "block_id": "approved_vacations_notifications_selector",
+        "text": {"type": "mrkdwn", "text": "Pick a channel for notifications about approved vacations:"},
+        "accessory": {
+            "action_id": "approved_vacations_notifications_selector",
+            "type": "channels_select",
+            "placeholder": {"type": "plain_text", "text": "Select a channel"},
+            "initial_channel": table_object.get_notifications_channel()["channel_id"],
+        }
+    }
+    holidays_country_options = [
+        {"text": {"type": "plain_text", "text": country}, "value": country}
+        for country in get_holiday_calendars().countries
+    ]
+    holidays_country_selector_block = {
+        "type": "section",
+        "block_id": "holidays_country_selector",
+        "text": {"type": "mrkdwn", "text": "Pick a country, which holidays are not counted as vacation working days:"},
+        "accessory": {
+            "action_id": "holidays_country_selector",
+            "type": "static_select",
+            "placeholder": {"type": "plain_text", "text": "Select a country"},
+            "options": holidays_country_options,
+        }
+    }
+    for option in holidays_country_options:
+        if option["value"] == table_object.get_holidays_country()["country_code"]:
+            holidays_country_selector_block["accessory"]["initial_option"] = option
+    return View(
+        type="modal",
+        callback_id="configure_workspace",
+        title={"type": "plain_text", "text": "Configure workspace", "emoji": True},
+        submit={"type": "plain_text", "text": "Submit", "emoji": True},
+        close={"type": "plain_text", "text": "Cancel", "emoji": True},
+        blocks=[decision_maker_selector_block, notifications_channel_selector_block, holidays_country_selector_block],
+    ).to_dict()
+
+
+def build_book_vacation_modal_view_from_scratch():
+    from slack_sdk.models.views import View
+
+    today_string = str(datetime.date.today())
+    return View(
+        type="modal",
+        callback_id="book_vacation",
+        title={"type": "plain_text", "text": "Book a vacation", "emoji": True},
+        submit={"type": "plain_text", "text": "Submit", "emoji": True},
+        close={"type": "plain_text", "text": "Cancel", "emoji": True},
+        blocks=[
+            {"type": "section", "text": {"type": "mrkdwn", "text": "*Please select the vacation start date:*"}},
+            {
+                "type": "actions",
+                "block_id": "vacation_dates",
+                "elements": [
+                    {"type": "datepicker", "initial_date": today_string, "action_id": "vacation_start_date"},
+                    {"type": "datepicker", "initial_date": today_string, "action_id": "vacation_end_date"},
+                ],
+            }
+        ]
+    ).to_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=10000, help="Renders per case and measurement")
+    parser.add_argument("--repeat", type=int, default=5, help="Measurements per case, the best one is reported")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("USER_VACATIONS_TABLE_NAME", "benchmark-user-vacations")
+    sys.path.insert(0, LAYER_DIR)
+    from slack import views
+
+    table_object = FakeSettingsTable()
+
+    cases = {
+        "book_vacation modal": (
+            build_book_vacation_modal_view_from_scratch,
+            views.get_book_vacation_modal_view,
+        ),
+        "configure_workspace modal": (
+            lambda: build_configure_workspace_modal_view_from_scratch(table_object),
+            lambda: views.get_configure_workspace_modal_view(table_object),
+        ),
+    }
+
+    print(f"{'case':<32}{'from scratch, us':>18}{'template, us':>16}{'speedup':>10}")
+    for name, (build_from_scratch, render_from_template) in cases.items():
+        if build_from_scratch() != render_from_template():
+            raise SystemExit(f"{name}: rendered from template differs from built from scratch.")
+        timings = []
+        for render in (build_from_scratch, render_from_template):
+            best = min(timeit.repeat(lambda: json.dumps(render()), number=args.number, repeat=args.repeat))
+            timings.append(best / args.number * 1e6)
+        print(f"{name:<32}{timings[0]:>18.1f}{timings[1]:>16.1f}{timings[0] / timings[1]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+Replay captured traffic (see src/layers/main_layer/traffic_capture.py) through the handlers
+against local DynamoDB and a fake Slack API, then report latencies and downstream calls per event kind.
+
+Each worker process imports the handlers once and handles one event at a time, as a lambda container does.
+Holiday calendars have to be compiled locally (build_tools/compile_holiday_calendars.py of the main layer)
+and passed by HOLIDAY_CALENDARS_PATH environment variable.
+
+Example:
+    python tools/replay_traffic.py captures/**/*.jsonl.gz --dynamodb-endpoint http://localhost:8000 \\
+        --create-table --speed 10 --concurrency 8
+"""
+import argparse
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import gzip
+import importlib.util
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from urllib import parse
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAYER_DIR = os.path.join(REPO_ROOT, "src", "layers", "main_layer")
+HANDLERS = {
+    "process_interactivity": (
+        os.path.join(REPO_ROOT, "src", "handlers", "process_interactivity", "index.py"), "process_interactivity"
+    ),
+    "process_vacations": (
+        os.path.join(REPO_ROOT, "src", "handlers", "streams_processors", "vacations", "index.py"), "process_vacations"
+    ),
+}
+
+TABLE_NAME = "replay-user-vacations"
+ROOT_WORKSPACE_ID = "T0REPLAYROOT"
+BOT_USER_ID = "U0REPLAYBOT"
+REPLAY_ACCESS_TOKEN = "xoxb-replay"
+
+FAKE_SLACK_RESPONSES = {
+    "auth.test": {"ok": True, "user_id": BOT_USER_ID},
+    "conversations.info": {"ok": True, "channel": {"is_member": True}},
+    "conversations.members": {"ok": True, "members": [BOT_USER_ID], "response_metadata": {"next_cursor": ""}},
+    "chat.postMessage": {"ok": True, "ts": "0.0"},
+    "views.open": {"ok": True, "view": {}},
+}
+
+
+class FakeSlackRequestHandler(BaseHTTPRequestHandler):
+    """Answers Slack Web API methods (/api/{method}) and response_url webhooks (/webhook) with canned responses."""
+    def _respond(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        path = parse.urlparse(self.path).path
+        method = path.rsplit("/", 1)[-1]
+        if method == "users.info":
+            user_id = parse.parse_qs(parse.urlparse(self.path).query).get("user", ["U0REPLAY"])[0]
+            response = {"ok": True, "user": {"id": user_id, "name": f"user_{user_id.lower()}"}}
+        else:
+            response = FAKE_SLACK_RESPONSES.get(method, {"ok": True})
+        body = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeSsmClient:
+    def __init__(self, parameters):
+        self._parameters = parameters
+
+    def get_parameter(self, Name, **kwargs):
+        return {"Parameter": {"Value": self._parameters[Name]}}
+
+
+class FakeLambdaContext:
+    function_name = "replay"
+    memory_limit_in_mb = 128
+    invoked_function_arn = "arn:aws:lambda:local:000000000000:function:replay"
+
+    def __init__(self, request_id, timeout_ms=10000):
+        self.aws_request_id = request_id
+        self._deadline = time.monotonic() + timeout_ms / 1000
+
+    def get_remaining_time_in_millis(self):
+        return int((self._deadline - time.monotonic()) * 1000)
+
+
+def set_up_environment(dynamodb_endpoint):
+    """Point layer modules to local DynamoDB and fake SSM. Must be called before the layer modules are imported."""
+    os.environ.update(
+        USER_VACATIONS_TABLE_NAME=TABLE_NAME,
+        SERVICE_NAME=os.getenv("SERVICE_NAME", "HR-slack-bot-replay"),
+        ROOT_WORKSPACE_ID_SSM_PARAM="root-workspace-id",
+        ROOT_BOT_HEALTH_CHANNEL_ID_SSM_PARAM="root-health-channel-id",
+        TRAFFIC_CAPTURE_SAMPLING_RATE="0",
+    )
+    for variable, default_value in (
+        ("AWS_DEFAULT_REGION", "eu-central-1"), ("AWS_ACCESS_KEY_ID", "replay"), ("AWS_SECRET_ACCESS_KEY", "replay")
+    ):
+        os.environ.setdefault(variable, default_value)
+    sys.path.insert(0, LAYER_DIR)
+
+    import boto3
+    original_resource = boto3.resource
+
+    def resource(service_name, *args, **kwargs):
+        if service_name == "dynamodb":
+            kwargs.setdefault("endpoint_url", dynamodb_endpoint)
+        return original_resource(service_name, *args, **kwargs)
+    boto3.resource = resource
+
+    import aws.ssm
+    aws.ssm.ssm_client = FakeSsmClient({"root-workspace-id": ROOT_WORKSPACE_ID, "root-health-channel-id": "C0REPLAY"})
+
+
+def create_table(dynamodb_endpoint):
+    import boto3
+    key_attributes = ("pk", "sk", "vacation_status", "gsi2_pk", "gsi2_sk")
+    boto3.client("dynamodb", endpoint_url=dynamodb_endpoint).create_table(
+        TableName=TABLE_NAME,
+        AttributeDefinitions=[{"AttributeName": name, "AttributeType": "S"} for name in key_attributes],
+        KeySchema=[{"AttributeName": "pk", "KeyType": "HASH"}, {"AttributeName": "sk", "KeyType": "RANGE"}],
+        BillingMode="PAY_PER_REQUEST",
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "gsi1",
+                "KeySchema": [{"AttributeName": "vacation_status", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "gsi2",
+                "KeySchema": [
+                    {"AttributeName": "gsi2_pk", "KeyType": "HASH"}, {"AttributeName": "gsi2_sk", "KeyType": "RANGE"}
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    )
+
+
+def read_captured_events(paths):
+    captured_events = []
+    for path in paths:
+        with gzip.open(path, "rt") as captured_file:
+            captured_events.extend(json.loads(line) for line in captured_file if line.strip())
+    return sorted(captured_events, key=lambda captured_event: captured_event["captured_at"])
+
+
+def get_interactivity_payload(event):
+    return json.loads(parse.parse_qs(event["body"])["payload"][0])
+
+
+def get_event_kind(captured_event):
+    event = captured_event["event"]
+    if captured_event["handler"] == "process_vacations":
+        return f"stream batch of {len(event.get('Records', []))}"
+    payload = get_interactivity_payload(event)
+    callback_id = payload.get("callback_id") or payload.get("view", {}).get("callback_id")
+    return ":".join(filter(None, [payload.get("type"), callback_id]))
+
+
+def get_workspace_ids(captured_event):
+    event = captured_event["event"]
+    if captured_event["handler"] == "process_vacations":
+        return {
+            record["dynamodb"]["NewImage"]["workspace_id"]["S"]
+            for record in event.get("Records", [])
+            if "workspace_id" in record["dynamodb"].get("NewImage", {})
+        }
+    return {get_interactivity_payload(event)["team"]["id"]}
+
+
+def seed_workspaces(workspace_ids):
+    from aws.dynamodb import VacationsTable
+    table = VacationsTable()
+    for workspace_id in workspace_ids | {ROOT_WORKSPACE_ID}:
+        if not table.get_workspace(workspace_id):
+            table.save_workspace(workspace_id, REPLAY_ACCESS_TOKEN, BOT_USER_ID)
+
+
+# Worker process state
+_handlers = {}
+_calls = Counter()
+_fake_slack_url = None
+
+
+def _count_dynamodb_call(model, **kwargs):
+    _calls[f"dynamodb.{model.name}"] += 1
+
+
+def init_worker(dynamodb_endpoint, fake_slack_url):
+    global _fake_slack_url
+    _fake_slack_url = fake_slack_url
+    set_up_environment(dynamodb_endpoint)
+
+    import requests
+    from slack_sdk import WebClient
+    original_api_call = WebClient.api_call
+    original_post = requests.post
+
+    def api_call(self, api_method, *args, **kwargs):
+        _calls[f"slack.{api_method}"] += 1
+        return original_api_call(self, api_method, *args, **kwargs)
+
+    def post(url, *args, **kwargs):
+        _calls["slack.webhook"] += 1
+        return original_post(url, *args, **kwargs)
+    WebClient.api_call = api_call
+    requests.post = post
+
+    for handler_name, (handler_path, function_name) in HANDLERS.items():
+        # Handlers of each lambda live in index.py, so they are loaded under unique module names.
+        handler_dir = os.path.dirname(handler_path)
+        sys.path.insert(0, handler_dir)
+        spec = importlib.util.spec_from_file_location(f"replay_{handler_name}", handler_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.path.remove(handler_dir)
+        _handlers[handler_name] = getattr(module, function_name)
+
+    import aws.dynamodb
+    aws.dynamodb.dynamodb.meta.client.meta.events.register("before-call.dynamodb", _count_dynamodb_call)
+    for module in list(sys.modules.values()):
+        if isinstance(slack_client := getattr(module, "slack_client", None), WebClient):
+            slack_client.base_url = f"{fake_slack_url}/api/"
+
+
+def replay_event(captured_event, index):
+    from traffic_capture import transform_interactivity_body, RESPONSE_URL_PLACEHOLDER
+
+    event = captured_event["event"]
+    if captured_event["handler"] == "process_interactivity":
+        event = {
+            **event,
+            "body": transform_interactivity_body(
+                event["body"],
+                lambda payload: {**payload, "response_url": f"{_fake_slack_url}/webhook"}
+                if payload.get("response_url") == RESPONSE_URL_PLACEHOLDER else payload,
+            ),
+        }
+    _calls.clear()
+    started_at = time.perf_counter()
+    _handlers[captured_event["handler"]](event, FakeLambdaContext(f"replay-{index}"))
+    return (time.perf_counter() - started_at) * 1000, dict(_calls)
+
+
+def percentile(sorted_values, percent):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))]
+
+
+def print_report(results):
+    print(f"{'event kind':<45}{'count':>7}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for kind, kind_results in sorted(results.items()):
+        latencies = sorted(latency for latency, _ in kind_results)
+        print(
+            f"{kind:<45}{len(latencies):>7}"
+            + "".join(f"{percentile(latencies, percent):>9.1f}" for percent in (50, 90, 99, 100))
+        )
+        calls = Counter()
+        for _, event_calls in kind_results:
+            calls.update(event_calls)
+        for call_name, count in sorted(calls.items()):
+            print(f"    {call_name:<41}{count / len(kind_results):>7.2f} per event")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="Captured .jsonl.gz files or glob patterns")
+    parser.add_argument("--dynamodb-endpoint", default="http://localhost:8000")
+    parser.add_argument("--create-table", action="store_true", help="Create the table in local DynamoDB")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed factor, 0 replays without pauses")
+    parser.add_argument("--concurrency", type=int, default=4, help="Number of simulated lambda containers")
+    args = parser.parse_args()
+
+    paths = [path for pattern in args.paths for path in sorted(glob.glob(pattern, recursive=True))]
+    captured_events = read_captured_events(paths)
+    if not captured_events:
+        parser.error("No captured events found.")
+
+    fake_slack_server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSlackRequestHandler)
+    threading.Thread(target=fake_slack_server.serve_forever, daemon=True).start()
+    fake_slack_url = f"http://127.0.0.1:{fake_slack_server.server_port}"
+
+    set_up_environment(args.dynamodb_endpoint)
+    if args.create_table:
+        create_table(args.dynamodb_endpoint)
+    seed_workspaces(set().union(*map(get_workspace_ids, captured_events)))
+
+    results = defaultdict(list)
+    with ProcessPoolExecutor(
+            max_workers=args.concurrency,
+            # Spawned workers import the handlers from scratch, like new lambda containers.
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(args.dynamodb_endpoint, fake_slack_url),
+    ) as executor:
+        first_captured_at = captured_events[0]["captured_at"]
+        replay_started_at = time.monotonic()
+        futures = []
+        for index, captured_event in enumerate(captured_events):
+            if args.speed:
+                delay = (captured_event["captured_at"] - first_captured_at) / args.speed
+                time.sleep(max(0.0, replay_started_at + delay - time.monotonic()))
+            futures.append((get_event_kind(captured_event), executor.submit(replay_event, captured_event, index)))
+        for kind, future in futures:
+            results[kind].append(future.result())
+
+    fake_slack_server.shutdown()
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()